@@ -88,6 +88,16 @@ function _xmlEscape(text) {
         .replace(/"/g, "&quot;");
 }
 
+function _minifySvg(svg) {
+    // Drop indentation, blank lines and whitespace between tags; line breaks
+    // inside tags become a single space (mirrors the Python _minify_svg)
+    return svg.split("\n")
+        .map(line => line.trim())
+        .filter(line => line)
+        .join(" ")
+        .split("> <").join("><");
+}
+
 // ===========================================================================
 // Data Model
 // ===========================================================================
@@ -729,15 +739,15 @@ class TypeResolver {
         if (connDO.some(n => !typeDO.has(n)))
             inst.dataOutputs = connDO.map(n => new Port(n));
 
-        // Add parameter ports not already present
+        // Add parameter ports not already present.  The port lists may still
+        // be the cached type interface, so extend a copy rather than in place.
         const existingDI = new Set(inst.dataInputs.map(p => p.name));
         const existingEI = new Set(inst.eventInputs.map(p => p.name));
-        for (const paramName of Object.keys(inst.parameters)) {
-            if (!paramName.startsWith("__") && !existingDI.has(paramName) && !existingEI.has(paramName)) {
-                inst.dataInputs.push(new Port(paramName));
-                existingDI.add(paramName);
-            }
-        }
+        const extraDI = Object.keys(inst.parameters)
+            .filter(n => !n.startsWith("__") && !existingDI.has(n) && !existingEI.has(n))
+            .map(n => new Port(n));
+        if (extraDI.length > 0)
+            inst.dataInputs = inst.dataInputs.concat(extraDI);
     }
 }
 
@@ -1411,6 +1421,7 @@ class NetworkSVGRenderer {
     constructor(options = {}) {
         this.showShadow = options.showShadow !== false;
         this.showGrid = options.showGrid || false;
+        this.minify = options.minify || false;
         this.settings = options.settings || new BlockSizeSettings();
 
         this.FONT_FAMILY = "'TGL 0-17_std', 'TGL 0-17', 'Times New Roman', Times, serif";
@@ -1718,21 +1729,6 @@ class NetworkSVGRenderer {
             parts.push(`  <rect x="${gx.toFixed(1)}" y="${gy.toFixed(1)}" width="${gw.toFixed(1)}" height="${gh.toFixed(1)}" fill="url(#grid)"/>`);
         }
 
-        // Assign interface indices for staggered routing of interface connections
-        let leftIdx = 0;
-        let rightIdx = 0;
-        for (const conn of model.connections) {
-            const srcParts = conn.source.split(".");
-            const dstParts = conn.destination.split(".");
-            if (srcParts.length === 1 && srcParts[0] in interfaceMap) {
-                conn._ifaceIndex = leftIdx;
-                leftIdx += 1;
-            } else if (dstParts.length === 1 && dstParts[0] in interfaceMap) {
-                conn._ifaceIndex = rightIdx;
-                rightIdx += 1;
-            }
-        }
-
         // Connections
         const router = new ConnectionRouter();
         parts.push('  <g id="connections">');
@@ -1761,7 +1757,8 @@ class NetworkSVGRenderer {
         parts.push('  </g>');
 
         parts.push('</svg>');
-        return parts.join("\n");
+        const svg = parts.join("\n");
+        return this.minify ? _minifySvg(svg) : svg;
     }
 
     _svgHeader(vbX, vbY, vbW, vbH) {
@@ -2220,6 +2217,7 @@ class NetworkSVGRenderer {
  * @param {string} xmlString - The XML content
  * @param {Object} options - Rendering options
  * @param {boolean} options.showShadow - Show drop shadow (default: true)
+ * @param {boolean} options.minify - Emit compact SVG without indentation and line breaks
  * @param {Object} options.typeLibXmls - Map of type name → XML string for type resolution
  * @returns {string} SVG content
  */
@@ -2257,7 +2255,7 @@ if (typeof module !== 'undefined' && module.exports) {
 
         const args = process.argv.slice(2);
         if (args.length === 0) {
-            console.log('Usage: node iec61499_network_to_svg.js input.fbt [-o output.svg] [--type-lib path] [--no-shadow] [--grid]');
+            console.log('Usage: node iec61499_network_to_svg.js input.fbt [-o output.svg] [--type-lib path] [--no-shadow] [--grid] [--minify]');
             process.exit(1);
         }
 
@@ -2272,6 +2270,7 @@ if (typeof module !== 'undefined' && module.exports) {
             else if (args[i] === '--type-lib' && args[i + 1]) typeLibPaths.push(args[++i]);
             else if (args[i] === '--no-shadow') options.showShadow = false;
             else if (args[i] === '--grid') options.showGrid = true;
+            else if (args[i] === '--minify') options.minify = true;
             else if (args[i] === '--settings' && args[i + 1]) settingsPath = args[++i];
         }
 
@@ -8,28 +8,117 @@ diagrams in the style of 4diac IDE's network view.
 Shows FB instances as boxes with event/data/adapter connections routed between them.
 """
 
-import xml.etree.ElementTree as ET
 import argparse
-import configparser
+import functools
+import json
 import sys
 import os
 from pathlib import Path
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 from dataclasses import dataclass, field
+from itertools import chain, repeat
 from typing import Optional, Dict, List, Tuple
 
-# Try to import Pillow for accurate text measurement
+# Try to import lxml for faster XML parsing (large type libraries),
+# fall back to the stdlib ElementTree
 try:
-    from PIL import ImageFont
-    PILLOW_AVAILABLE = True
+    from lxml import etree as ET
+    LXML_AVAILABLE = True
 except ImportError:
-    PILLOW_AVAILABLE = False
+    import xml.etree.ElementTree as ET
+    LXML_AVAILABLE = False
+
+
+
+# ===========================================================================
+# Text Measurement (shared by layout engine and renderer)
+# ===========================================================================
+
+def _font_candidates() -> Tuple[List[str], List[str]]:
+    """Return (regular, italic) font file candidates in order of preference."""
+    home = os.path.expanduser("~")
+    script_dir = os.path.dirname(os.path.abspath(__file__))
+    tgl_dir = os.path.join(script_dir, "tgl")
+    font_candidates = [
+        f"{home}/Library/Fonts/TGL 0-17.ttf",
+        f"{home}/Library/Fonts/TGL 0-17_std.ttf",
+        f"{home}/Library/Fonts/TGL 0-17 alt.ttf",
+        f"{home}/Library/Fonts/TGL 0-17 alt_std.ttf",
+        os.path.join(tgl_dir, "TGL 0-17.ttf"),
+        os.path.join(tgl_dir, "TGL 0-17_std.ttf"),
+        "/Library/Fonts/TGL 0-17.ttf",
+        "/Library/Fonts/TGL 0-17 alt.ttf",
+        "/Library/Fonts/Times New Roman.ttf",
+        "/System/Library/Fonts/Times.ttc",
+        "/usr/share/fonts/truetype/msttcorefonts/Times_New_Roman.ttf",
+        "C:\\Windows\\Fonts\\times.ttf",
+    ]
+    italic_candidates = [
+        f"{home}/Library/Fonts/TGL 0-16.ttf",
+        f"{home}/Library/Fonts/TGL 0-16_std.ttf",
+        os.path.join(tgl_dir, "TGL 0-16.ttf"),
+        os.path.join(tgl_dir, "TGL 0-16_std.ttf"),
+        "/Library/Fonts/TGL 0-16.ttf",
+        "/Library/Fonts/Times New Roman Italic.ttf",
+        "/System/Library/Fonts/Times.ttc",
+        "/usr/share/fonts/truetype/msttcorefonts/Times_New_Roman_Italic.ttf",
+        "C:\\Windows\\Fonts\\timesi.ttf",
+    ]
+    return font_candidates, italic_candidates
+
+
+@functools.lru_cache(maxsize=1)
+def _pil_imagefont():
+    """Import Pillow's ImageFont on first use; None if Pillow is missing.
+
+    Deferred so runs that never measure text don't pay Pillow's import cost.
+    """
+    try:
+        from PIL import ImageFont
+        return ImageFont
+    except ImportError:
+        return None
+
+
+@functools.lru_cache(maxsize=32)
+def _get_font(path: str, size: int):
+    """Load a TrueType font once per (path, size); None if it can't be loaded."""
+    try:
+        return _pil_imagefont().truetype(path, size)
+    except Exception:
+        return None
+
+
+@functools.lru_cache(maxsize=8)
+def _find_font_keys(size: int) -> Tuple[Optional[tuple], Optional[tuple]]:
+    """Pick the first loadable regular and italic fonts as (path, size) keys.
+
+    The italic key falls back to the regular one; both are None without Pillow.
+    """
+    if _pil_imagefont() is None:
+        return None, None
+    font_candidates, italic_candidates = _font_candidates()
+    # A stat is far cheaper than a failed truetype() call and its exception
+    regular = next(((fp, size) for fp in font_candidates
+                    if os.path.isfile(fp) and _get_font(fp, size)), None)
+    italic = next(((fp, size) for fp in italic_candidates
+                   if os.path.isfile(fp) and _get_font(fp, size)), None)
+    return regular, italic or regular
+
+
+@functools.lru_cache(maxsize=4096)
+def _measure_text_width(text: str, font_key: tuple) -> float:
+    """Width of text in the font identified by font_key (memoized per label)."""
+    bbox = _get_font(*font_key).getbbox(text)
+    return bbox[2] - bbox[0] if bbox else len(text) * 8
 
 
 # ===========================================================================
 # Block Size Settings (4diac IDE defaults)
 # ===========================================================================
 
-@dataclass
+@dataclass(slots=True)
 class BlockSizeSettings:
     """4diac IDE Block Size settings that control label truncation and margins."""
     max_value_label_size: int = 25
@@ -62,6 +151,7 @@ def load_block_size_settings(path: str = None) -> BlockSizeSettings:
         path = str(Path(__file__).parent / "block_size_settings.ini")
     if not Path(path).exists():
         return settings
+    import configparser  # Only needed when a settings file exists
     cp = configparser.ConfigParser()
     cp.read(path)
     if "BlockSize" in cp:
@@ -89,14 +179,16 @@ def load_block_size_settings(path: str = None) -> BlockSizeSettings:
     return settings
 
 
+_ELLIPSIS = "…"
+
+
 def _truncate_label(text: str, max_len: int) -> str:
     """Truncate a label and append '...' if it exceeds max_len characters.
 
     If max_len <= 0, no truncation is applied.
     """
-    if max_len <= 0 or len(text) <= max_len:
-        return text
-    return text[:max_len] + "…"
+    # The common case (label fits) returns without building a new string
+    return text if max_len <= 0 or len(text) <= max_len else text[:max_len] + _ELLIPSIS
 
 
 def _format_parameter_value(value: str, port_type: str = "") -> str:
@@ -123,11 +215,42 @@ def _xml_escape(text: str) -> str:
         .replace('"', "&quot;"))
 
 
+_FMT_1F_CACHE: Dict[float, str] = {}
+
+
+def _fmt_1f(x: float) -> str:
+    """Format x like f"{x:.1f}", memoized.
+
+    Port rows and bend coordinates repeat across many connections and
+    labels, so most calls are a dict hit. Zero is never cached because 0.0
+    and -0.0 are the same key but format differently.
+    """
+    s = _FMT_1F_CACHE.get(x)
+    if s is None:
+        s = f"{x:.1f}"
+        if x:
+            if len(_FMT_1F_CACHE) >= 4096:
+                _FMT_1F_CACHE.clear()
+            _FMT_1F_CACHE[x] = s
+    return s
+
+
+def _minify_svg(svg: str) -> str:
+    """Drop indentation, blank lines and whitespace between tags.
+
+    Line breaks inside tags (multi-line path data, attribute lists) become a
+    single space. Label text never spans lines, and escaped text cannot
+    contain a literal "> <", so text content is untouched.
+    """
+    lines = filter(None, (line.strip() for line in svg.split("\n")))
+    return " ".join(lines).replace("> <", "><")
+
+
 # ===========================================================================
 # Data Model
 # ===========================================================================
 
-@dataclass
+@dataclass(slots=True)
 class Port:
     """Represents an event, data, or adapter port."""
     name: str
@@ -136,7 +259,7 @@ class Port:
     associated_vars: list = field(default_factory=list)  # WITH associations (event→data var names)
 
 
-@dataclass
+@dataclass(slots=True)
 class FBInstance:
     """Represents an FB or SubApp instance in the network."""
     name: str
@@ -170,7 +293,7 @@ class FBInstance:
     port_positions: Dict[str, Tuple[float, float]] = field(default_factory=dict)
 
 
-@dataclass
+@dataclass(slots=True)
 class Connection:
     """Represents a connection between ports in the network."""
     source: str
@@ -181,7 +304,7 @@ class Connection:
     conn_type: str = "data"      # "event", "data", or "adapter"
 
 
-@dataclass
+@dataclass(slots=True)
 class InterfacePort:
     """Port on the SubApp/Composite boundary (left/right edges)."""
     name: str
@@ -192,7 +315,7 @@ class InterfacePort:
     render_y: float = 0
 
 
-@dataclass
+@dataclass(slots=True)
 class NetworkModel:
     """Complete network model."""
     name: str = ""
@@ -212,31 +335,99 @@ class NetworkModel:
     # Canvas-to-pixel mapping (set by layout engine)
     canvas_origin_x: float = 0   # pixel x corresponding to canvas x=0
     canvas_origin_y: float = 0   # pixel y corresponding to canvas y=0
+    # Instance name → FBInstance, built on first use (once parsing has added all instances)
+    _instance_map: Optional[Dict[str, FBInstance]] = field(default=None, init=False, repr=False, compare=False)
+    _interface_map: Optional[Dict[str, InterfacePort]] = field(default=None, init=False, repr=False, compare=False)
+
+    def instance_map(self) -> Dict[str, FBInstance]:
+        """Return the instance name → FBInstance lookup, building it once."""
+        if self._instance_map is None:
+            self._instance_map = {inst.name: inst for inst in self.instances}
+        return self._instance_map
+
+    def interface_map(self) -> Dict[str, InterfacePort]:
+        """Return the interface port name → InterfacePort lookup, building it once."""
+        if self._interface_map is None:
+            self._interface_map = {ip.name: ip for ip in self.interface_ports}
+        return self._interface_map
 
 
 # ===========================================================================
 # Network Parser
 # ===========================================================================
 
+def _is_xml_text(source) -> bool:
+    """True if source is an XML document string rather than a file path.
+
+    Only the first non-blank character is inspected, so large documents are
+    not scanned before parsing.
+    """
+    return isinstance(source, str) and source.lstrip("\ufeff \t\r\n")[:1] == "<"
+
+
+def _fattr(elem: ET.Element, name: str, default: float = 0.0) -> float:
+    """Read a numeric XML attribute, returning default when it is absent."""
+    value = elem.get(name)
+    return float(value) if value is not None else default
+
+
 class NetworkParser:
     """Parses IEC 61499 XML to extract the internal network structure."""
 
+    # Connection list element → Connection.conn_type
+    CONNECTION_TAGS = {
+        "EventConnections": "event",
+        "DataConnections": "data",
+        "AdapterConnections": "adapter",
+    }
+
+    # Interface section → (direction, category, port element tag).
+    # Ports are emitted in this order, whatever the order in the file.
+    SUBAPP_INTERFACE_SECTIONS = {
+        "SubAppEventInputs": ("input", "event", "SubAppEvent"),
+        "SubAppEventOutputs": ("output", "event", "SubAppEvent"),
+        "InputVars": ("input", "data", "VarDeclaration"),
+        "OutputVars": ("output", "data", "VarDeclaration"),
+        # Adapter sockets → input, plugs → output interface ports (in sidebar)
+        "Sockets": ("input", "adapter", "AdapterDeclaration"),
+        "Plugs": ("output", "adapter", "AdapterDeclaration"),
+    }
+    # Same for composite FBTypes; adapters become instances, and their
+    # "direction" is the adapter kind
+    FBTYPE_INTERFACE_SECTIONS = {
+        "EventInputs": ("input", "event", "Event"),
+        "EventOutputs": ("output", "event", "Event"),
+        "InputVars": ("input", "data", "VarDeclaration"),
+        "OutputVars": ("output", "data", "VarDeclaration"),
+        "Plugs": ("plug", "adapter", "AdapterDeclaration"),
+        "Sockets": ("socket", "adapter", "AdapterDeclaration"),
+    }
+
+    def __init__(self):
+        # Root tag → parser
+        self._dispatch = {
+            "SubAppType": self._parse_subapp_type,
+            "FBType": self._parse_fb_type,
+            "System": self._parse_system,
+        }
+
     def parse(self, xml_source) -> NetworkModel:
-        """Parse XML from file path or string."""
-        if isinstance(xml_source, str) and ('<' in xml_source):
-            root = ET.fromstring(xml_source)
+        """Parse XML from a file path, an XML string, XML bytes or a parsed root element."""
+        if ET.iselement(xml_source):
+            root = xml_source
+        elif isinstance(xml_source, (bytes, bytearray)):
+            root = ET.fromstring(bytes(xml_source))
+        elif _is_xml_text(xml_source):
+            # lxml rejects str input that carries an encoding declaration
+            root = ET.fromstring(xml_source.encode("utf-8") if LXML_AVAILABLE else xml_source)
         else:
             tree = ET.parse(xml_source)
             root = tree.getroot()
 
-        if root.tag == "SubAppType":
-            return self._parse_subapp_type(root)
-        elif root.tag == "FBType":
-            return self._parse_fb_type(root)
-        elif root.tag == "System":
-            return self._parse_system(root)
-        else:
+        handler = self._dispatch.get(root.tag)
+        if handler is None:
             raise ValueError(f"Unknown root element: {root.tag}")
+        return handler(root)
 
     def _parse_subapp_type(self, root: ET.Element) -> NetworkModel:
         model = NetworkModel(
@@ -299,247 +490,304 @@ class NetworkParser:
 
         return model
 
+    def _collect_interface_sections(self, iface: ET.Element, sections: dict) -> Dict[str, list]:
+        """Gather the port elements of each known section in one pass over iface."""
+        found = {tag: [] for tag in sections}
+        for section in iface:
+            spec = sections.get(section.tag)
+            if spec is not None:
+                found[section.tag].extend(section.iterfind(spec[2]))
+        return found
+
     def _parse_subapp_interface(self, iface: ET.Element, model: NetworkModel):
         """Parse SubAppInterfaceList to extract boundary ports."""
-        # Event inputs
-        for section in iface.findall("SubAppEventInputs"):
-            for ev in section.findall("SubAppEvent"):
+        found = self._collect_interface_sections(iface, self.SUBAPP_INTERFACE_SECTIONS)
+        for tag, (direction, category, _) in self.SUBAPP_INTERFACE_SECTIONS.items():
+            default_type = "Event" if category == "event" else ""
+            for elem in found[tag]:
                 model.interface_ports.append(InterfacePort(
-                    name=ev.get("Name", ""),
-                    port_type=ev.get("Type", "Event"),
-                    direction="input",
-                    category="event"
-                ))
-
-        # Event outputs
-        for section in iface.findall("SubAppEventOutputs"):
-            for ev in section.findall("SubAppEvent"):
-                model.interface_ports.append(InterfacePort(
-                    name=ev.get("Name", ""),
-                    port_type=ev.get("Type", "Event"),
-                    direction="output",
-                    category="event"
-                ))
-
-        # Data inputs
-        for section in iface.findall("InputVars"):
-            for var in section.findall("VarDeclaration"):
-                model.interface_ports.append(InterfacePort(
-                    name=var.get("Name", ""),
-                    port_type=var.get("Type", ""),
-                    direction="input",
-                    category="data"
-                ))
-
-        # Data outputs
-        for section in iface.findall("OutputVars"):
-            for var in section.findall("VarDeclaration"):
-                model.interface_ports.append(InterfacePort(
-                    name=var.get("Name", ""),
-                    port_type=var.get("Type", ""),
-                    direction="output",
-                    category="data"
-                ))
-
-        # Adapter sockets → input interface ports (in sidebar)
-        for section in iface.findall("Sockets"):
-            for adp in section.findall("AdapterDeclaration"):
-                model.interface_ports.append(InterfacePort(
-                    name=adp.get("Name", ""),
-                    port_type=adp.get("Type", ""),
-                    direction="input",
-                    category="adapter"
-                ))
-
-        # Adapter plugs → output interface ports (in sidebar)
-        for section in iface.findall("Plugs"):
-            for adp in section.findall("AdapterDeclaration"):
-                model.interface_ports.append(InterfacePort(
-                    name=adp.get("Name", ""),
-                    port_type=adp.get("Type", ""),
-                    direction="output",
-                    category="adapter"
+                    name=elem.get("Name", ""),
+                    port_type=sys.intern(elem.get("Type", default_type)),
+                    direction=direction,
+                    category=category
                 ))
 
     def _parse_fbtype_interface(self, iface: ET.Element, model: NetworkModel):
         """Parse InterfaceList for a composite FBType."""
-        # Event inputs
-        for section in iface.findall("EventInputs"):
-            for ev in section.findall("Event"):
-                model.interface_ports.append(InterfacePort(
-                    name=ev.get("Name", ""),
-                    port_type=ev.get("Type", "Event"),
-                    direction="input",
-                    category="event"
-                ))
-
-        # Event outputs
-        for section in iface.findall("EventOutputs"):
-            for ev in section.findall("Event"):
-                model.interface_ports.append(InterfacePort(
-                    name=ev.get("Name", ""),
-                    port_type=ev.get("Type", "Event"),
-                    direction="output",
-                    category="event"
-                ))
-
-        # Data inputs
-        for section in iface.findall("InputVars"):
-            for var in section.findall("VarDeclaration"):
-                model.interface_ports.append(InterfacePort(
-                    name=var.get("Name", ""),
-                    port_type=var.get("Type", ""),
-                    direction="input",
-                    category="data"
-                ))
-
-        # Data outputs
-        for section in iface.findall("OutputVars"):
-            for var in section.findall("VarDeclaration"):
+        found = self._collect_interface_sections(iface, self.FBTYPE_INTERFACE_SECTIONS)
+        for tag, (direction, category, _) in self.FBTYPE_INTERFACE_SECTIONS.items():
+            if category == "adapter":
+                # Plugs/sockets → adapter instances in the network
+                for adp in found[tag]:
+                    model.instances.append(FBInstance(
+                        name=adp.get("Name", ""),
+                        type_name=sys.intern(adp.get("Type", "")),
+                        x=_fattr(adp, "x"),
+                        y=_fattr(adp, "y"),
+                        is_adapter=True,
+                        adapter_kind=direction,
+                        fb_type="Adapter"
+                    ))
+                continue
+            default_type = "Event" if category == "event" else ""
+            for elem in found[tag]:
                 model.interface_ports.append(InterfacePort(
-                    name=var.get("Name", ""),
-                    port_type=var.get("Type", ""),
-                    direction="output",
-                    category="data"
+                    name=elem.get("Name", ""),
+                    port_type=sys.intern(elem.get("Type", default_type)),
+                    direction=direction,
+                    category=category
                 ))
 
-        # Plugs → adapter instances in the network
-        for section in iface.findall("Plugs"):
-            for adp in section.findall("AdapterDeclaration"):
-                inst = FBInstance(
-                    name=adp.get("Name", ""),
-                    type_name=adp.get("Type", ""),
-                    x=float(adp.get("x", "0")),
-                    y=float(adp.get("y", "0")),
-                    is_adapter=True,
-                    adapter_kind="plug",
-                    fb_type="Adapter"
-                )
-                model.instances.append(inst)
-
-        # Sockets → adapter instances in the network
-        for section in iface.findall("Sockets"):
-            for adp in section.findall("AdapterDeclaration"):
-                inst = FBInstance(
-                    name=adp.get("Name", ""),
-                    type_name=adp.get("Type", ""),
-                    x=float(adp.get("x", "0")),
-                    y=float(adp.get("y", "0")),
-                    is_adapter=True,
-                    adapter_kind="socket",
-                    fb_type="Adapter"
-                )
-                model.instances.append(inst)
-
     def _parse_network_contents(self, network: ET.Element, model: NetworkModel):
         """Parse FB/SubApp instances and connections from network element."""
-        # Parse FB instances
-        for fb_elem in network.findall("FB"):
-            inst = FBInstance(
-                name=fb_elem.get("Name", ""),
-                type_name=fb_elem.get("Type", ""),
-                x=float(fb_elem.get("x", "0")),
-                y=float(fb_elem.get("y", "0")),
-            )
-            # Parse parameters
-            for param in fb_elem.findall("Parameter"):
-                inst.parameters[param.get("Name", "")] = param.get("Value", "")
-            # Check for DataType attribute (type override)
-            for attr in fb_elem.findall("Attribute"):
-                if attr.get("Name") == "DataType":
-                    inst.parameters["__DataType__"] = attr.get("Value", "")
-            model.instances.append(inst)
-
-        # Parse SubApp instances
-        for sub_elem in network.findall("SubApp"):
-            inst = FBInstance(
-                name=sub_elem.get("Name", ""),
-                type_name=sub_elem.get("Type", ""),
-                x=float(sub_elem.get("x", "0")),
-                y=float(sub_elem.get("y", "0")),
-                is_subapp=True,
-                fb_type="SubApp"
-            )
-            for param in sub_elem.findall("Parameter"):
-                inst.parameters[param.get("Name", "")] = param.get("Value", "")
-            model.instances.append(inst)
-
-        # Parse connections
-        for ec in network.findall("EventConnections"):
-            for conn in ec.findall("Connection"):
-                model.connections.append(Connection(
-                    source=conn.get("Source", ""),
-                    destination=conn.get("Destination", ""),
-                    dx1=float(conn.get("dx1", "0")),
-                    dx2=float(conn.get("dx2", "0")),
-                    dy=float(conn.get("dy", "0")),
-                    conn_type="event"
-                ))
-
-        for dc in network.findall("DataConnections"):
-            for conn in dc.findall("Connection"):
-                model.connections.append(Connection(
-                    source=conn.get("Source", ""),
-                    destination=conn.get("Destination", ""),
-                    dx1=float(conn.get("dx1", "0")),
-                    dx2=float(conn.get("dx2", "0")),
-                    dy=float(conn.get("dy", "0")),
-                    conn_type="data"
-                ))
+        # Single pass over the network children.  Results are bucketed so the
+        # model keeps its established order (FBs, SubApps, then event, data
+        # and adapter connections) regardless of element order in the file.
+        fbs, subapps = [], []
+        conns = {"event": [], "data": [], "adapter": []}
+        for child in network:
+            tag = child.tag
+            if tag == "FB" or tag == "SubApp":
+                is_subapp = tag == "SubApp"
+                inst = FBInstance(
+                    name=child.get("Name", ""),
+                    type_name=sys.intern(child.get("Type", "")),
+                    x=_fattr(child, "x"),
+                    y=_fattr(child, "y"),
+                    is_subapp=is_subapp,
+                    fb_type="SubApp" if is_subapp else ""
+                )
+                for sub in child:
+                    if sub.tag == "Parameter":
+                        inst.parameters[sub.get("Name", "")] = sub.get("Value", "")
+                    # Check for DataType attribute (type override, FBs only)
+                    elif sub.tag == "Attribute" and not is_subapp and sub.get("Name") == "DataType":
+                        inst.parameters["__DataType__"] = sub.get("Value", "")
+                (subapps if is_subapp else fbs).append(inst)
+            else:
+                conn_type = self.CONNECTION_TAGS.get(tag)
+                if conn_type is None:
+                    continue
+                bucket = conns[conn_type]
+                for conn in child.iterfind("Connection"):
+                    bucket.append(Connection(
+                        source=conn.get("Source", ""),
+                        destination=conn.get("Destination", ""),
+                        dx1=_fattr(conn, "dx1"),
+                        dx2=_fattr(conn, "dx2"),
+                        dy=_fattr(conn, "dy"),
+                        conn_type=conn_type
+                    ))
 
-        for ac in network.findall("AdapterConnections"):
-            for conn in ac.findall("Connection"):
-                model.connections.append(Connection(
-                    source=conn.get("Source", ""),
-                    destination=conn.get("Destination", ""),
-                    dx1=float(conn.get("dx1", "0")),
-                    dx2=float(conn.get("dx2", "0")),
-                    dy=float(conn.get("dy", "0")),
-                    conn_type="adapter"
-                ))
+        model.instances.extend(fbs)
+        model.instances.extend(subapps)
+        for conn_type in ("event", "data", "adapter"):
+            model.connections.extend(conns[conn_type])
 
 
 # ===========================================================================
 # Type Resolver
 # ===========================================================================
 
+# Interface sections read by TypeResolver._extract_interface:
+# (result key, section tags, port element tags, port kind)
+_PORT_SECTIONS = (
+    ('event_inputs', ("EventInputs", "SubAppEventInputs"), ("Event", "SubAppEvent"), "event"),
+    ('event_outputs', ("EventOutputs", "SubAppEventOutputs"), ("Event", "SubAppEvent"), "event"),
+    ('data_inputs', ("InputVars",), ("VarDeclaration",), "var"),
+    ('data_outputs', ("OutputVars",), ("VarDeclaration",), "var"),
+    ('plugs', ("Plugs",), ("AdapterDeclaration",), "adapter"),
+    ('sockets', ("Sockets",), ("AdapterDeclaration",), "adapter"),
+)
+
+def _available_cpus() -> int:
+    """Number of CPUs this process may run on (its affinity mask where supported)."""
+    if hasattr(os, "sched_getaffinity"):
+        return len(os.sched_getaffinity(0))
+    return os.cpu_count() or 1
+
+
+def default_type_cache_path() -> str:
+    """Location of the persistent type cache (honours XDG_CACHE_HOME)."""
+    base = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+    return os.path.join(base, "iec61499_svg", "type_cache.json")
+
+
 class TypeResolver:
-    """Resolves FB instance interfaces from type library or connection inference."""
+    """Resolves FB instance interfaces from type library or connection inference.
+
+    With use_disk_cache, parsed interfaces are also kept in a persistent cache
+    file (see default_type_cache_path).  It is loaded once per resolver; new
+    and reused entries are only written by save_disk_cache(), which the owner
+    calls once per conversion or batch.
+    """
 
-    def __init__(self, type_lib_paths: List[str] = None):
+    # Bump when the cached interface layout changes
+    DISK_CACHE_VERSION = 1
+    # Upper bound on cached type files; least recently used entries go first
+    DISK_CACHE_MAX_ENTRIES = 5000
+    # Type file parsing holds the GIL, so prefetch threads mostly overlap
+    # file reads; more than a few only add contention
+    PREFETCH_MAX_THREADS = 4
+    IFACE_PORT_KEYS = ('event_inputs', 'event_outputs', 'data_inputs',
+                       'data_outputs', 'plugs', 'sockets')
+
+    def __init__(self, type_lib_paths: List[str] = None, use_disk_cache: bool = False,
+                 prefetch_threads: Optional[int] = None):
         self.type_lib_paths = type_lib_paths or []
-        self._type_cache: Dict[str, dict] = {}
+        # None: up to PREFETCH_MAX_THREADS, bounded by the available CPUs
+        self.prefetch_threads = prefetch_threads
+        self._type_cache: Dict[str, Optional[dict]] = {}  # None = not found / unparsable
         self._file_index: Dict[str, str] = {}  # type_name → file_path
         self._index_built = False
+        # Persistent cache: abspath → {mtime_ns, size, iface}
+        self._disk_cache_path = default_type_cache_path() if use_disk_cache else None
+        self._disk_cache: Optional[Dict[str, dict]] = None
+        # Entries parsed or reused since the last save, to merge into the file
+        self._disk_cache_updates: Dict[str, dict] = {}
+        # fb_name → [(is_source, conn_type, port_name)], built per resolve()
+        self._conn_index: Dict[str, list] = {}
+
+    def _load_disk_cache(self):
+        """Load the persistent type cache (a missing or corrupt file is ignored)."""
+        if self._disk_cache is not None:
+            return
+        self._disk_cache = {}
+        if not self._disk_cache_path:
+            return
+        try:
+            with open(self._disk_cache_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            if data.get('version') == self.DISK_CACHE_VERSION:
+                self._disk_cache = data.get('entries', {})
+        except (OSError, ValueError, AttributeError):
+            pass
+
+    def take_disk_cache_updates(self) -> Dict[str, dict]:
+        """Return and forget the cache entries parsed or reused since the last call."""
+        updates, self._disk_cache_updates = self._disk_cache_updates, {}
+        return updates
+
+    def save_disk_cache(self):
+        """Merge the entries parsed or reused by this resolver into the cache file."""
+        if self._disk_cache_path:
+            self.merge_disk_cache(self._disk_cache_path, self.take_disk_cache_updates())
+
+    @classmethod
+    def merge_disk_cache(cls, path: str, updates: Dict[str, dict]):
+        """Merge entries into the persistent cache file at path.
+
+        The file is re-read right before writing, so entries saved meanwhile
+        by other runs are kept.  Entries whose type file is gone or changed
+        are dropped, and the least recently used ones beyond
+        DISK_CACHE_MAX_ENTRIES are evicted.  Write errors are ignored.
+        """
+        if not updates:
+            return
+        entries = {}
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            if data.get('version') == cls.DISK_CACHE_VERSION:
+                entries = data.get('entries', {})
+        except (OSError, ValueError, AttributeError):
+            pass
+
+        merged = {}
+        for key, entry in entries.items():
+            if key in updates:
+                continue
+            try:
+                st = os.stat(key)
+                if entry.get('mtime_ns') == st.st_mtime_ns and entry.get('size') == st.st_size:
+                    merged[key] = entry
+            except (OSError, AttributeError):
+                pass  # File removed or malformed entry
+        # Entries used by this run go last: they are the most recently used
+        merged.update(updates)
+        excess = len(merged) - cls.DISK_CACHE_MAX_ENTRIES
+        if excess > 0:
+            merged = dict(list(merged.items())[excess:])
+
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump({'version': cls.DISK_CACHE_VERSION, 'entries': merged}, f)
+            # Atomic replace so concurrent runs never see a partial file
+            os.replace(tmp_path, path)
+        except OSError:
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+
+    def _iface_to_cache(self, iface: dict) -> dict:
+        """Convert an interface dict to plain JSON data (Port → list)."""
+        entry = {'fb_type': iface['fb_type']}
+        for key in self.IFACE_PORT_KEYS:
+            entry[key] = [[p.name, p.port_type, p.comment, list(p.associated_vars)]
+                          for p in iface[key]]
+        return entry
+
+    def _iface_from_cache(self, entry: dict) -> dict:
+        """Rebuild an interface dict from cached JSON data."""
+        _intern = sys.intern
+        iface = {'fb_type': _intern(entry['fb_type'])}
+        for key in self.IFACE_PORT_KEYS:
+            iface[key] = [Port(name=name, port_type=_intern(port_type), comment=comment,
+                               associated_vars=list(assoc))
+                          for name, port_type, comment, assoc in entry[key]]
+        return iface
+
+    # Indexed extensions, in precedence order (later wins on name clashes)
+    INDEX_EXTS = ('.fbt', '.sub', '.adp')
 
     def _build_file_index(self):
         """Build an index of type names to file paths."""
         if self._index_built:
             return
         for lib_path in self.type_lib_paths:
-            lib = Path(lib_path)
-            if not lib.exists():
+            if not os.path.isdir(lib_path):
                 continue
-            for ext in ['*.fbt', '*.sub', '*.adp']:
-                for f in lib.rglob(ext):
+            # Single traversal; entries are bucketed per extension so
+            # precedence between .fbt/.sub/.adp of the same name is kept
+            found = {ext: [] for ext in self.INDEX_EXTS}
+            # Follow symlinked directories like rglob did, but stop at a
+            # directory that is its own ancestor (a symlink cycle)
+            real_dirs = {}
+            for dirpath, dirnames, filenames in os.walk(lib_path, followlinks=True):
+                real_dir = real_dirs[dirpath] = os.path.realpath(dirpath)
+                parent = os.path.dirname(dirpath)
+                while parent in real_dirs and real_dirs[parent] != real_dir:
+                    parent = os.path.dirname(parent)
+                if parent in real_dirs:
+                    dirnames[:] = []
+                    continue
+                rel_dir = os.path.relpath(dirpath, lib_path)
+                # Namespace of this directory: iec61499/events → iec61499::events
+                prefix = "" if rel_dir == os.curdir else rel_dir.replace(os.sep, "::")
+                for filename in filenames:
+                    stem, ext = os.path.splitext(filename)
+                    bucket = found.get(ext)
+                    if bucket is not None:
+                        bucket.append((stem, prefix, os.path.join(dirpath, filename)))
+            for ext in self.INDEX_EXTS:
+                for stem, prefix, file_path in found[ext]:
                     # Index by filename (without extension)
-                    name = f.stem
-                    self._file_index[name] = str(f)
+                    self._file_index[stem] = file_path
                     # Also index by relative path with :: separators
-                    try:
-                        rel = f.relative_to(lib)
-                        # Convert path to :: namespace: iec61499/events/E_SWITCH.fbt → iec61499::events::E_SWITCH
-                        parts = list(rel.parts)
-                        parts[-1] = f.stem  # Remove extension
-                        qualified = "::".join(parts)
-                        self._file_index[qualified] = str(f)
-                    except ValueError:
-                        pass
+                    # iec61499/events/E_SWITCH.fbt → iec61499::events::E_SWITCH
+                    # (files at the library root have no namespace to add)
+                    if prefix:
+                        self._file_index[f"{prefix}::{stem}"] = file_path
         self._index_built = True
 
     def resolve(self, model: NetworkModel):
         """Resolve interfaces for all instances in the model."""
         self._build_file_index()
+        self._prefetch_types({inst.type_name for inst in model.instances})
+        self._conn_index = self._build_connection_index(model)
 
         for inst in model.instances:
             if inst.is_adapter:
@@ -547,6 +795,52 @@ class TypeResolver:
             else:
                 self._resolve_instance(inst, model)
 
+    @staticmethod
+    def _build_connection_index(model: NetworkModel) -> Dict[str, list]:
+        """Index connection endpoints of the form FBName.PortName by FB name."""
+        index = defaultdict(list)
+        for conn in model.connections:
+            # partition avoids a list per endpoint; a dotted tail means
+            # more than two parts, which is not an FB port reference
+            head, sep, tail = conn.source.partition(".")
+            if sep and "." not in tail:
+                index[head].append((True, conn.conn_type, tail))
+            head, sep, tail = conn.destination.partition(".")
+            if sep and "." not in tail:
+                index[head].append((False, conn.conn_type, tail))
+        return index
+
+    def _connection_port_names(self, inst: FBInstance):
+        """Return (event_in, event_out, data_in, data_out) port names that
+        connections reference on an instance, in first-seen order."""
+        ei, eo, di, do = {}, {}, {}, {}
+        for is_source, conn_type, port_name in self._conn_index.get(inst.name, ()):
+            if conn_type == "event":
+                (eo if is_source else ei)[port_name] = None
+            elif conn_type == "data":
+                (do if is_source else di)[port_name] = None
+        return list(ei), list(eo), list(di), list(do)
+
+    def _prefetch_types(self, type_names):
+        """Parse all uncached type files concurrently.
+
+        Fills ``_type_cache`` up front so the per-instance pass in resolve()
+        only hits the cache.  Parsing itself holds the GIL, so the few
+        threads mainly overlap file reads.  Each lookup touches distinct keys
+        of the shared dicts, so no locking is needed; the disk cache is
+        loaded beforehand to keep its lazy initialisation out of the threads.
+        """
+        threads = self.prefetch_threads or min(_available_cpus(), self.PREFETCH_MAX_THREADS)
+        pending = [name for name in type_names if name not in self._type_cache]
+        workers = min(len(pending), threads)
+        if workers < 2:
+            return
+        self._load_disk_cache()
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            # Drain the iterator so every lookup has finished
+            for _ in pool.map(self._lookup_type, pending):
+                pass
+
     def _resolve_instance(self, inst: FBInstance, model: NetworkModel):
         """Resolve a single FB/SubApp instance interface."""
         # Tier 1: Filesystem lookup
@@ -607,17 +901,78 @@ class TypeResolver:
             short_name = type_name.split("::")[-1] if "::" in type_name else type_name
             file_path = self._file_index.get(short_name)
 
-        if not file_path:
-            return None
-
-        try:
-            tree = ET.parse(file_path)
-            root = tree.getroot()
-            iface = self._extract_interface(root)
-            self._type_cache[type_name] = iface
-            return iface
-        except Exception:
-            return None
+        iface = None
+        if file_path:
+            try:
+                iface = self._read_type_file(file_path)
+            except Exception:
+                pass
+        # Negative results are cached too, so an unknown or broken type
+        # referenced by many instances is only looked up once
+        self._type_cache[type_name] = iface
+        return iface
+
+    def _read_type_file(self, file_path: str) -> dict:
+        """Return a type file's interface, from the disk cache if still valid."""
+        self._load_disk_cache()
+        st = os.stat(file_path)
+        key = os.path.abspath(file_path)
+        entry = self._disk_cache.get(key)
+        if entry and entry.get('mtime_ns') == st.st_mtime_ns and entry.get('size') == st.st_size:
+            try:
+                iface = self._iface_from_cache(entry['iface'])
+                self._disk_cache_updates[key] = entry
+                return iface
+            except (KeyError, TypeError, ValueError):
+                pass  # Malformed entry: re-parse below
+
+        iface = self._parse_type_file(file_path)
+        # Snapshot now: the returned Port lists are shared with instances
+        # and may be supplemented later in resolve()
+        entry = {'mtime_ns': st.st_mtime_ns, 'size': st.st_size,
+                 'iface': self._iface_to_cache(iface)}
+        self._disk_cache[key] = self._disk_cache_updates[key] = entry
+        return iface
+
+    # Root children that _extract_interface reads (everything else is discarded)
+    INTERFACE_TAGS = ("InterfaceList", "SubAppInterfaceList")
+    FB_KIND_TAGS = ("BasicFB", "CompositeFB", "FBNetwork", "SimpleFB")
+
+    def _parse_type_file(self, file_path: str) -> dict:
+        """Stream a type file and extract its interface.
+
+        Only the root tag, the FB kind element (BasicFB, CompositeFB, ...) and
+        the interface list are needed.  All other subtrees (ECC, algorithms,
+        internal networks) are cleared as soon as they are complete, and
+        parsing stops once the interface and the FB kind have been seen.
+        """
+        root = None
+        depth = 0
+        in_iface = False
+        iface_done = False
+        kind_seen = False
+        for event, elem in ET.iterparse(file_path, events=("start", "end")):
+            if event == "start":
+                depth += 1
+                if depth == 1:
+                    root = elem
+                elif depth == 2:
+                    if elem.tag in self.INTERFACE_TAGS:
+                        in_iface = True
+                    elif elem.tag in self.FB_KIND_TAGS:
+                        kind_seen = True
+                continue
+            depth -= 1
+            if depth == 1 and in_iface:
+                in_iface = False
+                iface_done = True
+            elif depth > 0 and not in_iface:
+                # Cleared elements stay attached to the root, so
+                # root.find("BasicFB") etc. still work afterwards
+                elem.clear()
+            if iface_done and (kind_seen or root.tag != "FBType"):
+                break
+        return self._extract_interface(root)
 
     def _extract_interface(self, root: ET.Element) -> dict:
         """Extract interface from a parsed XML root."""
@@ -653,65 +1008,31 @@ class TypeResolver:
         if iface is None:
             return result
 
-        # Event inputs
-        for section_tag in ["EventInputs", "SubAppEventInputs"]:
-            for section in iface.findall(section_tag):
-                for ev in section.findall("Event") + section.findall("SubAppEvent"):
-                    with_vars = [w.get("Var", "") for w in ev.findall("With") if w.get("Var")]
-                    result['event_inputs'].append(Port(
-                        name=ev.get("Name", ""),
-                        port_type=ev.get("Type", "Event"),
-                        comment=ev.get("Comment", ""),
-                        associated_vars=with_vars,
-                    ))
-
-        # Event outputs
-        for section_tag in ["EventOutputs", "SubAppEventOutputs"]:
-            for section in iface.findall(section_tag):
-                for ev in section.findall("Event") + section.findall("SubAppEvent"):
-                    with_vars = [w.get("Var", "") for w in ev.findall("With") if w.get("Var")]
-                    result['event_outputs'].append(Port(
-                        name=ev.get("Name", ""),
-                        port_type=ev.get("Type", "Event"),
-                        comment=ev.get("Comment", ""),
-                        associated_vars=with_vars,
-                    ))
-
-        # Data inputs
-        for section in iface.findall("InputVars"):
-            for var in section.findall("VarDeclaration"):
-                result['data_inputs'].append(Port(
-                    name=var.get("Name", ""),
-                    port_type=self._build_type_string(var),
-                    comment=var.get("Comment", "")
-                ))
-
-        # Data outputs
-        for section in iface.findall("OutputVars"):
-            for var in section.findall("VarDeclaration"):
-                result['data_outputs'].append(Port(
-                    name=var.get("Name", ""),
-                    port_type=self._build_type_string(var),
-                    comment=var.get("Comment", "")
-                ))
-
-        # Plugs
-        for section in iface.findall("Plugs"):
-            for adp in section.findall("AdapterDeclaration"):
-                result['plugs'].append(Port(
-                    name=adp.get("Name", ""),
-                    port_type=adp.get("Type", ""),
-                    comment=adp.get("Comment", "")
-                ))
-
-        # Sockets
-        for section in iface.findall("Sockets"):
-            for adp in section.findall("AdapterDeclaration"):
-                result['sockets'].append(Port(
-                    name=adp.get("Name", ""),
-                    port_type=adp.get("Type", ""),
-                    comment=adp.get("Comment", "")
-                ))
+        _intern = sys.intern  # Port types repeat across thousands of ports
+        for key, section_tags, child_tags, kind in _PORT_SECTIONS:
+            ports = result[key]
+            for section_tag in section_tags:
+                for section in iface.iterfind(section_tag):
+                    for elem in chain.from_iterable(section.iterfind(t) for t in child_tags):
+                        if kind == "event":
+                            ports.append(Port(
+                                name=elem.get("Name", ""),
+                                port_type=_intern(elem.get("Type", "Event")),
+                                comment=elem.get("Comment", ""),
+                                associated_vars=[v for w in elem.iterfind("With") if (v := w.get("Var"))],
+                            ))
+                        elif kind == "var":
+                            ports.append(Port(
+                                name=elem.get("Name", ""),
+                                port_type=_intern(self._build_type_string(elem)),
+                                comment=elem.get("Comment", "")
+                            ))
+                        else:
+                            ports.append(Port(
+                                name=elem.get("Name", ""),
+                                port_type=_intern(elem.get("Type", "")),
+                                comment=elem.get("Comment", "")
+                            ))
 
         return result
 
@@ -733,34 +1054,8 @@ class TypeResolver:
 
     def _infer_from_connections(self, inst: FBInstance, model: NetworkModel):
         """Infer ports from connection endpoints."""
-        event_in_names = []
-        event_out_names = []
-        data_in_names = []
-        data_out_names = []
-
-        for conn in model.connections:
-            src_parts = conn.source.split(".")
-            dst_parts = conn.destination.split(".")
-
-            # Source: FBName.PortName → output port
-            if len(src_parts) == 2 and src_parts[0] == inst.name:
-                port_name = src_parts[1]
-                if conn.conn_type == "event":
-                    if port_name not in event_out_names:
-                        event_out_names.append(port_name)
-                elif conn.conn_type == "data":
-                    if port_name not in data_out_names:
-                        data_out_names.append(port_name)
-
-            # Destination: FBName.PortName → input port
-            if len(dst_parts) == 2 and dst_parts[0] == inst.name:
-                port_name = dst_parts[1]
-                if conn.conn_type == "event":
-                    if port_name not in event_in_names:
-                        event_in_names.append(port_name)
-                elif conn.conn_type == "data":
-                    if port_name not in data_in_names:
-                        data_in_names.append(port_name)
+        event_in_names, event_out_names, data_in_names, data_out_names = \
+            self._connection_port_names(inst)
 
         # Add parameter ports that aren't already in data_in_names
         for param_name in inst.parameters:
@@ -784,29 +1079,7 @@ class TypeResolver:
         the type definition, replace that category entirely with connection-inferred
         ports (the type's port names don't match the instance's actual ports).
         """
-        conn_ei, conn_eo, conn_di, conn_do = [], [], [], []
-
-        for conn in model.connections:
-            src_parts = conn.source.split(".")
-            dst_parts = conn.destination.split(".")
-
-            if len(src_parts) == 2 and src_parts[0] == inst.name:
-                port_name = src_parts[1]
-                if conn.conn_type == "event":
-                    if port_name not in conn_eo:
-                        conn_eo.append(port_name)
-                elif conn.conn_type == "data":
-                    if port_name not in conn_do:
-                        conn_do.append(port_name)
-
-            if len(dst_parts) == 2 and dst_parts[0] == inst.name:
-                port_name = dst_parts[1]
-                if conn.conn_type == "event":
-                    if port_name not in conn_ei:
-                        conn_ei.append(port_name)
-                elif conn.conn_type == "data":
-                    if port_name not in conn_di:
-                        conn_di.append(port_name)
+        conn_ei, conn_eo, conn_di, conn_do = self._connection_port_names(inst)
 
         # For each category: if any connection port is missing from type def,
         # replace that category with connection-inferred ports
@@ -824,13 +1097,15 @@ class TypeResolver:
         if any(n not in type_do for n in conn_do):
             inst.data_outputs = [Port(name=n) for n in conn_do]
 
-        # Add parameter ports not already present
+        # Add parameter ports not already present.  The port lists may still
+        # be the cached type interface, so extend a copy rather than in place.
         existing_di = {p.name for p in inst.data_inputs}
         existing_ei = {p.name for p in inst.event_inputs}
-        for param_name in inst.parameters:
-            if not param_name.startswith("__") and param_name not in existing_di and param_name not in existing_ei:
-                inst.data_inputs.append(Port(name=param_name))
-                existing_di.add(param_name)
+        extra_di = [Port(name=param_name) for param_name in inst.parameters
+                    if not param_name.startswith("__")
+                    and param_name not in existing_di and param_name not in existing_ei]
+        if extra_di:
+            inst.data_inputs = inst.data_inputs + extra_di
 
 
 # ===========================================================================
@@ -847,6 +1122,9 @@ class NetworkLayoutEngine:
     PORT_ROW_HEIGHT = 17
     BLOCK_PADDING = 10
     NAME_SECTION_HEIGHT = 14  # notch height matching 4diac IDE
+    # Name section width around the type label: notch (4diac FB_NOTCH_INSET = 9),
+    # GridLayout marginWidth 3, 16x16 SWT icon, setIconTextGap(2), margin, notch
+    NAME_DECORATION_WIDTH = 9 + 3 + 16 + 2 + 3 + 9
     BLOCK_MARGIN_PX = 2       # SWT GridLayout margins: marginHeight=1 per section, net +2
     INSTANCE_LABEL_HEIGHT = 15  # Coordinate-system lineHeight (Menlo-12: 15px)
     CONNECTOR_WIDTH = 10
@@ -856,70 +1134,73 @@ class NetworkLayoutEngine:
     MARGIN = 60           # Margin around the diagram for interface ports
     SCALE = 0.15          # 4diac canvas units → SVG pixels (lineHeight/100 = 15/100)
 
+    # (font key, n) → width of "W" * n, shared by all engines
+    _W_WIDTHS: Dict[Tuple[Optional[tuple], int], float] = {}
+
     def __init__(self, settings: BlockSizeSettings = None):
         self.settings = settings or BlockSizeSettings()
-        self._font = None
-        self._font_italic = None
+        self._font_key = None
+        self._font_italic_key = None
+        self._measure_cache: Dict[Tuple[str, bool], float] = {}
+        self._label_cache: Dict[Tuple[str, int], float] = {}
+        self._min_pin_w = 0
+        self._min_iface_w = 0
         self._init_fonts()
 
     def _init_fonts(self):
         """Initialize fonts for text measurement."""
-        if not PILLOW_AVAILABLE:
-            return
-
-        home = os.path.expanduser("~")
-        script_dir = os.path.dirname(os.path.abspath(__file__))
-        tgl_dir = os.path.join(script_dir, "tgl")
-        font_candidates = [
-            f"{home}/Library/Fonts/TGL 0-17.ttf",
-            f"{home}/Library/Fonts/TGL 0-17_std.ttf",
-            f"{home}/Library/Fonts/TGL 0-17 alt.ttf",
-            f"{home}/Library/Fonts/TGL 0-17 alt_std.ttf",
-            os.path.join(tgl_dir, "TGL 0-17.ttf"),
-            os.path.join(tgl_dir, "TGL 0-17_std.ttf"),
-            "/Library/Fonts/TGL 0-17.ttf",
-            "/Library/Fonts/TGL 0-17 alt.ttf",
-            "/Library/Fonts/Times New Roman.ttf",
-            "/System/Library/Fonts/Times.ttc",
-            "/usr/share/fonts/truetype/msttcorefonts/Times_New_Roman.ttf",
-            "C:\\Windows\\Fonts\\times.ttf",
-        ]
-        italic_candidates = [
-            f"{home}/Library/Fonts/TGL 0-16.ttf",
-            f"{home}/Library/Fonts/TGL 0-16_std.ttf",
-            os.path.join(tgl_dir, "TGL 0-16.ttf"),
-            os.path.join(tgl_dir, "TGL 0-16_std.ttf"),
-            "/Library/Fonts/TGL 0-16.ttf",
-            "/Library/Fonts/Times New Roman Italic.ttf",
-            "/System/Library/Fonts/Times.ttc",
-            "/usr/share/fonts/truetype/msttcorefonts/Times_New_Roman_Italic.ttf",
-            "C:\\Windows\\Fonts\\timesi.ttf",
-        ]
-        for fp in font_candidates:
-            try:
-                self._font = ImageFont.truetype(fp, self.FONT_SIZE)
-                break
-            except:
-                continue
-        for fp in italic_candidates:
-            try:
-                self._font_italic = ImageFont.truetype(fp, self.FONT_SIZE)
-                break
-            except:
-                continue
-        if self._font_italic is None and self._font is not None:
-            self._font_italic = self._font
+        self._font_key, self._font_italic_key = _find_font_keys(self.FONT_SIZE)
 
     def _measure_text(self, text: str, italic: bool = False) -> float:
-        if PILLOW_AVAILABLE and self._font:
-            font = self._font_italic if italic and self._font_italic else self._font
-            bbox = font.getbbox(text)
-            return bbox[2] - bbox[0] if bbox else len(text) * 8
-        else:
-            return len(text) * 8.5
+        # Port and type labels repeat heavily across instances
+        key = (text, italic)
+        width = self._measure_cache.get(key)
+        if width is None:
+            if self._font_key:
+                width = _measure_text_width(text, self._font_italic_key if italic else self._font_key)
+            else:
+                width = len(text) * 8.5
+            self._measure_cache[key] = width
+        return width
+
+    def _w_width(self, n: int) -> float:
+        """Width of "W" * n (the 4diac minimum label size unit); 0 for n <= 0.
+
+        Shared across engines so batch runs measure each size once per font.
+        """
+        if n <= 0:
+            return 0
+        key = (self._font_key, n)
+        width = self._W_WIDTHS.get(key)
+        if width is None:
+            width = NetworkLayoutEngine._W_WIDTHS[key] = self._measure_text("W" * n)
+        return width
+
+    def _pin_side_width(self, ports, space: float) -> float:
+        """Width one side of a block needs for its pins (0 without pins).
+
+        space + max(min_pin_w, w) is monotonic in the label width w, so only
+        the widest truncated label of the group has to be considered.
+        """
+        max_pin = self.settings.max_pin_label_size
+        label_width = self._label_width
+        widest = max((label_width(port.name, max_pin) for port in ports), default=None)
+        return 0 if widest is None else space + max(self._min_pin_w, widest)
+
+    def _label_width(self, name: str, max_len: int) -> float:
+        """Width of a port label after truncation to max_len, measured once."""
+        key = (name, max_len)
+        width = self._label_cache.get(key)
+        if width is None:
+            width = self._label_cache[key] = self._measure_text(_truncate_label(name, max_len))
+        return width
 
     def layout(self, model: NetworkModel):
         """Compute all positions and sizes."""
+        # Minimum label widths depend only on the settings: measure once per layout
+        self._min_pin_w = self._w_width(self.settings.min_pin_label_size)
+        self._min_iface_w = self._w_width(self.settings.min_interface_bar_size)
+
         # Size each instance
         for inst in model.instances:
             self._size_instance(inst)
@@ -955,45 +1236,29 @@ class NetworkLayoutEngine:
         # The +1 accounts for the notch/name section (one lineHeight).
         # The BLOCK_MARGIN_PX (2) comes from SWT GridLayout margins
         # (marginHeight=1 per section, verticalSpacing=-1 between sections).
+        row_h = self.PORT_ROW_HEIGHT
         port_rows = num_event_rows + num_data_rows + num_adapter_rows
-        inst.block_height = (port_rows + 1) * self.PORT_ROW_HEIGHT + self.BLOCK_MARGIN_PX + 2  # +2 bottom padding
+        inst.block_height = (port_rows + 1) * row_h + self.BLOCK_MARGIN_PX + 2  # +2 bottom padding
 
-        inst.event_section_height = num_event_rows * self.PORT_ROW_HEIGHT + 4  # +2 top + 2 bottom padding
-        inst.data_section_height = (num_data_rows * self.PORT_ROW_HEIGHT + 1) if num_data_rows > 0 else 0  # +1 top padding
-        inst.adapter_section_height = num_adapter_rows * self.PORT_ROW_HEIGHT if num_adapter_rows > 0 else 0
+        inst.event_section_height = num_event_rows * row_h + 4  # +2 top + 2 bottom padding
+        inst.data_section_height = (num_data_rows * row_h + 1) if num_data_rows > 0 else 0  # +1 top padding
+        inst.adapter_section_height = num_adapter_rows * row_h if num_adapter_rows > 0 else 0
 
         # Width calculation
         # Instance name is rendered ABOVE the block, so it doesn't constrain block width.
         # Name section shows only the type name with icon.
         short_type = inst.type_name.split("::")[-1] if "::" in inst.type_name else inst.type_name
         short_type = _truncate_label(short_type, self.settings.max_type_label_size)
-        notch = 9              # 4diac FB_NOTCH_INSET = 9
-        icon_w = 16             # 4diac standard SWT icon size 16x16
-        gap_icon_text = 2       # 4diac setIconTextGap(2)
         type_width = self._measure_text(short_type, italic=True)
-        name_section_width = notch + 3 + icon_w + gap_icon_text + type_width + 3 + notch  # 3 = GridLayout marginWidth
+        name_section_width = type_width + self.NAME_DECORATION_WIDTH
 
         triangle_space = self.TRIANGLE_WIDTH + 1 + 1.5
         adapter_space = self.TRIANGLE_WIDTH * 2 + 1 + 1.5
 
-        # Minimum pin label width in pixels (from min_pin_label_size setting)
-        min_pin_w = self._measure_text("W" * self.settings.min_pin_label_size) if self.settings.min_pin_label_size > 0 else 0
-
-        max_left = 0
-        for port in inst.event_inputs + inst.data_inputs:
-            pw = triangle_space + max(min_pin_w, self._measure_text(_truncate_label(port.name, self.settings.max_pin_label_size)))
-            max_left = max(max_left, pw)
-        for port in inst.sockets:
-            pw = adapter_space + max(min_pin_w, self._measure_text(_truncate_label(port.name, self.settings.max_pin_label_size)))
-            max_left = max(max_left, pw)
-
-        max_right = 0
-        for port in inst.event_outputs + inst.data_outputs:
-            pw = triangle_space + max(min_pin_w, self._measure_text(_truncate_label(port.name, self.settings.max_pin_label_size)))
-            max_right = max(max_right, pw)
-        for port in inst.plugs:
-            pw = adapter_space + max(min_pin_w, self._measure_text(_truncate_label(port.name, self.settings.max_pin_label_size)))
-            max_right = max(max_right, pw)
+        max_left = max(self._pin_side_width(chain(inst.event_inputs, inst.data_inputs), triangle_space),
+                       self._pin_side_width(inst.sockets, adapter_space))
+        max_right = max(self._pin_side_width(chain(inst.event_outputs, inst.data_outputs), triangle_space),
+                        self._pin_side_width(inst.plugs, adapter_space))
 
         min_center_gap = 8
         ports_width = max_left + min_center_gap + max_right
@@ -1013,9 +1278,15 @@ class NetworkLayoutEngine:
         if not model.instances:
             return
 
-        # Find coordinate bounds
-        min_x = min(inst.x for inst in model.instances)
-        min_y = min(inst.y for inst in model.instances)
+        # Find coordinate bounds (one pass for both axes)
+        instances = model.instances
+        min_x = instances[0].x
+        min_y = instances[0].y
+        for inst in instances:
+            if inst.x < min_x:
+                min_x = inst.x
+            if inst.y < min_y:
+                min_y = inst.y
 
         # Apply scale and offset.
         # In 4diac IDE, (x, y) is the top-left of the entire figure including the
@@ -1023,11 +1294,14 @@ class NetworkLayoutEngine:
         # by INSTANCE_LABEL_HEIGHT so render_x/render_y point to the block body
         # top-left.  When the instance name is wider than the block, the block body
         # is centered within the figure — offset render_x accordingly.
-        for inst in model.instances:
-            inst.render_x = (inst.x - min_x) * self.SCALE + self.MARGIN
+        scale = self.SCALE
+        margin = self.MARGIN
+        label_h = self.INSTANCE_LABEL_HEIGHT
+        for inst in instances:
+            inst.render_x = (inst.x - min_x) * scale + margin
             inst.render_x += (inst.figure_width - inst.block_width) / 2
-            inst.render_y = (inst.y - min_y) * self.SCALE + self.MARGIN
-            inst.render_y += self.INSTANCE_LABEL_HEIGHT
+            inst.render_y = (inst.y - min_y) * scale + margin
+            inst.render_y += label_h
 
         # Store the mapping from canvas origin (0, 0) to pixel coordinates.
         # This is needed by the connection router: for interface→FB connections,
@@ -1038,58 +1312,30 @@ class NetworkLayoutEngine:
 
     def _compute_port_positions(self, inst: FBInstance):
         """Compute absolute (x, y) for each port on an instance."""
-        # Event inputs (left side) – centered in each row
-        y = 2 + self.PORT_ROW_HEIGHT / 2  # 2px top padding
-        for port in inst.event_inputs:
-            abs_x = inst.render_x
-            abs_y = inst.render_y + y
-            inst.port_positions[port.name] = (abs_x, abs_y)
-            y += self.PORT_ROW_HEIGHT
-
-        # Event outputs (right side)
-        y = 2 + self.PORT_ROW_HEIGHT / 2  # 2px top padding
-        for port in inst.event_outputs:
-            abs_x = inst.render_x + inst.block_width
-            abs_y = inst.render_y + y
-            inst.port_positions[port.name] = (abs_x, abs_y)
-            y += self.PORT_ROW_HEIGHT
-
-        # Data inputs (left side)
-        base_y = inst.name_section_bottom
-        y = base_y + 1 + self.PORT_ROW_HEIGHT / 2  # 1px top padding
-        for port in inst.data_inputs:
-            abs_x = inst.render_x
-            abs_y = inst.render_y + y
-            inst.port_positions[port.name] = (abs_x, abs_y)
-            y += self.PORT_ROW_HEIGHT
-
-        # Data outputs (right side)
-        y = base_y + 1 + self.PORT_ROW_HEIGHT / 2  # 1px top padding
-        for port in inst.data_outputs:
-            abs_x = inst.render_x + inst.block_width
-            abs_y = inst.render_y + y
-            inst.port_positions[port.name] = (abs_x, abs_y)
-            y += self.PORT_ROW_HEIGHT
-
-        # Adapter sockets (left side)
-        if inst.sockets:
-            adapter_base = inst.adapter_section_top
-            y = adapter_base + self.PORT_ROW_HEIGHT / 2
-            for port in inst.sockets:
-                abs_x = inst.render_x
-                abs_y = inst.render_y + y
-                inst.port_positions[port.name] = (abs_x, abs_y)
-                y += self.PORT_ROW_HEIGHT
-
-        # Adapter plugs (right side)
-        if inst.plugs:
-            adapter_base = inst.adapter_section_top
-            y = adapter_base + self.PORT_ROW_HEIGHT / 2
-            for port in inst.plugs:
-                abs_x = inst.render_x + inst.block_width
-                abs_y = inst.render_y + y
-                inst.port_positions[port.name] = (abs_x, abs_y)
-                y += self.PORT_ROW_HEIGHT
+        row_h = self.PORT_ROW_HEIGHT
+        left_x = inst.render_x
+        right_x = inst.render_x + inst.block_width
+        top = inst.render_y
+        positions = inst.port_positions
+
+        # Row centres of the first port in each section (relative to block top)
+        event_y = 2 + row_h / 2                              # 2px top padding
+        data_y = inst.name_section_bottom + 1 + row_h / 2    # 1px top padding
+        adapter_y = inst.adapter_section_top + row_h / 2
+
+        # Inputs/sockets on the left border, outputs/plugs on the right
+        columns = (
+            (inst.event_inputs, left_x, event_y),
+            (inst.event_outputs, right_x, event_y),
+            (inst.data_inputs, left_x, data_y),
+            (inst.data_outputs, right_x, data_y),
+            (inst.sockets, left_x, adapter_y),
+            (inst.plugs, right_x, adapter_y),
+        )
+        for ports, abs_x, y in columns:
+            for port in ports:
+                positions[port.name] = (abs_x, top + y)
+                y += row_h
 
     def _position_interface_ports(self, model: NetworkModel):
         """Position interface ports in light-blue sidebar areas on left/right edges.
@@ -1113,7 +1359,7 @@ class NetworkLayoutEngine:
         input_sidebar_w = 0
         input_sym_w = tri_w  # track widest symbol needed
         for p in inputs:
-            tw = self._measure_text(_truncate_label(p.name, max_iface))
+            tw = self._label_width(p.name, max_iface)
             input_sidebar_w = max(input_sidebar_w, tw)
             if p.category == "adapter":
                 input_sym_w = max(input_sym_w, adapter_sym_w)
@@ -1122,14 +1368,14 @@ class NetworkLayoutEngine:
         output_sidebar_w = 0
         output_sym_w = tri_w
         for p in outputs:
-            tw = self._measure_text(_truncate_label(p.name, max_iface))
+            tw = self._label_width(p.name, max_iface)
             output_sidebar_w = max(output_sidebar_w, tw)
             if p.category == "adapter":
                 output_sym_w = max(output_sym_w, adapter_sym_w)
         output_sidebar_w += sidebar_outer_margin + sidebar_gap + output_sym_w if outputs else 0
 
         # Clamp sidebar widths to min/max interface bar size
-        min_iface_w = self._measure_text("W" * self.settings.min_interface_bar_size) if self.settings.min_interface_bar_size > 0 else 0
+        min_iface_w = self._min_iface_w
         if inputs and input_sidebar_w < min_iface_w + sidebar_outer_margin + sidebar_gap + tri_w:
             input_sidebar_w = min_iface_w + sidebar_outer_margin + sidebar_gap + tri_w
         if outputs and output_sidebar_w < min_iface_w + sidebar_outer_margin + sidebar_gap + tri_w:
@@ -1141,10 +1387,21 @@ class NetworkLayoutEngine:
 
         # Find instance area bounds
         if model.instances:
-            inst_min_x = min(inst.render_x for inst in model.instances)
-            inst_max_x = max(inst.render_x + inst.block_width for inst in model.instances)
-            inst_min_y = min(inst.render_y - self.INSTANCE_LABEL_HEIGHT - 4 for inst in model.instances)  # label above
-            inst_max_y = max(inst.render_y + inst.block_height for inst in model.instances)
+            # One pass with running min/max scalars
+            inst_min_x = inst_min_y = float("inf")
+            inst_max_x = inst_max_y = float("-inf")
+            label_h = self.INSTANCE_LABEL_HEIGHT
+            for inst in model.instances:
+                x = inst.render_x
+                y = inst.render_y
+                if x < inst_min_x:
+                    inst_min_x = x
+                if x + inst.block_width > inst_max_x:
+                    inst_max_x = x + inst.block_width
+                if y - label_h - 4 < inst_min_y:  # label above
+                    inst_min_y = y - label_h - 4
+                if y + inst.block_height > inst_max_y:
+                    inst_max_y = y + inst.block_height
         else:
             inst_min_x, inst_max_x = self.MARGIN, self.MARGIN + 200
             inst_min_y, inst_max_y = self.MARGIN, self.MARGIN + 200
@@ -1165,7 +1422,29 @@ class NetworkLayoutEngine:
         #   We take the maximum turn_x and add padding.
         input_port_names = {p.name for p in inputs}
         output_port_names = {p.name for p in outputs}
-        instance_map_tmp = {inst.name: inst for inst in model.instances}
+        instance_map = model.instance_map()
+
+        # Classify interface connections with a turn hint in a single pass:
+        #   left_turns:  interface input → FB,  as (dx1_px, dst_inst)
+        #   right_turns: FB → interface output, as (dx1_px, src_inst, port_name)
+        # Port positions are looked up later, since instances may still shift.
+        left_turns = []
+        right_turns = []
+        for conn in model.connections:
+            if conn.dx1 == 0:
+                continue
+            src_head, src_sep, src_tail = conn.source.partition(".")
+            dst_head, dst_sep, dst_tail = conn.destination.partition(".")
+            if not src_sep and src_head in input_port_names:
+                if dst_sep and "." not in dst_tail:
+                    dst_inst = instance_map.get(dst_head)
+                    if dst_inst:
+                        left_turns.append((conn.dx1 * self.SCALE, dst_inst))
+            elif not dst_sep and dst_head in output_port_names:
+                if src_sep and "." not in src_tail:
+                    src_inst = instance_map.get(src_head)
+                    if src_inst:
+                        right_turns.append((conn.dx1 * self.SCALE, src_inst, src_tail))
 
         # --- Input (left) sidebar positioning ---
         # The sidebar must be left of all connection turn points that run between
@@ -1182,17 +1461,10 @@ class NetworkLayoutEngine:
         # the turn point should be closer to the sidebar than to the dest FB,
         # i.e. dx1_px < half the distance from inst_min_x to dest FB.
         max_turn_offset = 0.0
-        for conn in model.connections:
-            src_parts = conn.source.split(".")
-            if len(src_parts) == 1 and src_parts[0] in input_port_names and conn.dx1 != 0:
-                dx1_px = conn.dx1 * self.SCALE
-                dst_parts = conn.destination.split(".")
-                if len(dst_parts) == 2:
-                    dst_inst = instance_map_tmp.get(dst_parts[0])
-                    if dst_inst:
-                        dist_to_dest = dst_inst.render_x - inst_min_x
-                        if dx1_px <= dist_to_dest * 0.5:
-                            max_turn_offset = max(max_turn_offset, dx1_px)
+        for dx1_px, dst_inst in left_turns:
+            dist_to_dest = dst_inst.render_x - inst_min_x
+            if dx1_px <= dist_to_dest * 0.5:
+                max_turn_offset = max(max_turn_offset, dx1_px)
 
         sidebar_padding_left = 20
         sidebar_gap_left = max_turn_offset + sidebar_padding_left
@@ -1203,18 +1475,11 @@ class NetworkLayoutEngine:
         # large dx1 values — the turn point lands inside or past the FB.
         # In that case, shift all instances right to create room (like 4diac IDE).
         max_overshoot = 0.0
-        for conn in model.connections:
-            src_parts = conn.source.split(".")
-            if len(src_parts) == 1 and src_parts[0] in input_port_names and conn.dx1 != 0:
-                dx1_px = conn.dx1 * self.SCALE
-                dst_parts = conn.destination.split(".")
-                if len(dst_parts) == 2:
-                    dst_inst = instance_map_tmp.get(dst_parts[0])
-                    if dst_inst:
-                        turn_x = input_sidebar_right + dx1_px
-                        overshoot = turn_x - dst_inst.render_x
-                        if overshoot > 0:
-                            max_overshoot = max(max_overshoot, overshoot)
+        for dx1_px, dst_inst in left_turns:
+            turn_x = input_sidebar_right + dx1_px
+            overshoot = turn_x - dst_inst.render_x
+            if overshoot > 0:
+                max_overshoot = max(max_overshoot, overshoot)
 
         if max_overshoot > 0:
             # Add padding so the turn point is clearly left of the FB
@@ -1237,21 +1502,13 @@ class NetworkLayoutEngine:
         # between the source FB and a reasonable sidebar position (i.e. the turn
         # point doesn't route far back into the network to the left).
         max_right_turn_offset = 0.0
-        for conn in model.connections:
-            dst_parts = conn.destination.split(".")
-            if len(dst_parts) == 1 and dst_parts[0] in output_port_names and conn.dx1 != 0:
-                src_parts = conn.source.split(".")
-                if len(src_parts) == 2:
-                    src_inst = instance_map_tmp.get(src_parts[0])
-                    if src_inst:
-                        port_name = src_parts[1]
-                        if port_name in src_inst.port_positions:
-                            src_x = src_inst.port_positions[port_name][0]
-                            dx1_px = conn.dx1 * self.SCALE
-                            turn_x = src_x + dx1_px
-                            offset_from_right = turn_x - inst_max_x
-                            if offset_from_right > 0:
-                                max_right_turn_offset = max(max_right_turn_offset, offset_from_right)
+        for dx1_px, src_inst, port_name in right_turns:
+            if port_name in src_inst.port_positions:
+                src_x = src_inst.port_positions[port_name][0]
+                turn_x = src_x + dx1_px
+                offset_from_right = turn_x - inst_max_x
+                if offset_from_right > 0:
+                    max_right_turn_offset = max(max_right_turn_offset, offset_from_right)
 
         sidebar_padding_right = 20
         sidebar_gap_right = max_right_turn_offset + sidebar_padding_right
@@ -1299,30 +1556,10 @@ class NetworkLayoutEngine:
         HEADER_HEIGHT = 25   # Height of the header bar (margin + text + margin)
 
         # Determine the full horizontal and vertical extent (sidebars + instances)
-        all_x = []
-        all_y = []
-
-        label_above = self.INSTANCE_LABEL_HEIGHT + 4  # label height + padding above label
-        for inst in model.instances:
-            all_x.extend([inst.render_x, inst.render_x + inst.block_width])
-            all_y.extend([inst.render_y - label_above, inst.render_y + inst.block_height])
-
-        if model.input_sidebar_rect:
-            sx, sy, sw, sh = model.input_sidebar_rect
-            all_x.extend([sx, sx + sw])
-            all_y.extend([sy, sy + sh])
-        if model.output_sidebar_rect:
-            sx, sy, sw, sh = model.output_sidebar_rect
-            all_x.extend([sx, sx + sw])
-            all_y.extend([sy, sy + sh])
-
-        if not all_x:
+        extent = self._content_extent(model)
+        if extent is None:
             return
-
-        content_left = min(all_x)
-        content_right = max(all_x)
-        content_top = min(all_y)
-        content_bottom = max(all_y)
+        content_left, content_top, content_right, content_bottom = extent
 
         border_pad_v = 117  # vertical padding (top/bottom) between content extent and header/border
 
@@ -1408,32 +1645,47 @@ class NetworkLayoutEngine:
 
     def get_diagram_bounds(self, model: NetworkModel) -> Tuple[float, float, float, float]:
         """Get the bounding box of the entire diagram (min_x, min_y, max_x, max_y)."""
-        all_x = []
-        all_y = []
-
         # Use the outer border if available (it encompasses everything)
         if model.outer_border_rect:
             bx, by, bw, bh = model.outer_border_rect
             return bx, by, bx + bw, by + bh
 
-        for inst in model.instances:
-            all_x.extend([inst.render_x, inst.render_x + inst.block_width])
-            all_y.extend([inst.render_y - self.INSTANCE_LABEL_HEIGHT - 4, inst.render_y + inst.block_height])  # label above
+        extent = self._content_extent(model)
+        if extent is None:
+            return 0, 0, 100, 100
+        return extent
 
-        # Include sidebar rectangles in bounds
-        if model.input_sidebar_rect:
-            sx, sy, sw, sh = model.input_sidebar_rect
-            all_x.extend([sx, sx + sw])
-            all_y.extend([sy, sy + sh])
-        if model.output_sidebar_rect:
-            sx, sy, sw, sh = model.output_sidebar_rect
-            all_x.extend([sx, sx + sw])
-            all_y.extend([sy, sy + sh])
+    def _content_extent(self, model: NetworkModel) -> Optional[Tuple[float, float, float, float]]:
+        """Extent (left, top, right, bottom) of instances and sidebars.
 
-        if not all_x:
-            return 0, 0, 100, 100
+        Instance extents include the name label above the block.  Returns None
+        when there is nothing to measure.
+        """
+        left = top = float("inf")
+        right = bottom = float("-inf")
 
-        return min(all_x), min(all_y), max(all_x), max(all_y)
+        # Running min/max; block sizes are never negative
+        label_above = self.INSTANCE_LABEL_HEIGHT + 4  # label height + padding above label
+        for inst in model.instances:
+            x = inst.render_x
+            y = inst.render_y
+            left = min(left, x)
+            right = max(right, x + inst.block_width)
+            top = min(top, y - label_above)
+            bottom = max(bottom, y + inst.block_height)
+
+        # Include sidebar rectangles
+        for rect in (model.input_sidebar_rect, model.output_sidebar_rect):
+            if rect:
+                sx, sy, sw, sh = rect
+                left = min(left, sx)
+                right = max(right, sx + sw)
+                top = min(top, sy)
+                bottom = max(bottom, sy + sh)
+
+        if left > right:
+            return None
+        return left, top, right, bottom
 
 
 # ===========================================================================
@@ -1448,12 +1700,31 @@ class ConnectionRouter:
     def __init__(self):
         pass
 
+    def route_all(self, connections: List[Connection], model: NetworkModel,
+                  instance_map: Dict[str, FBInstance],
+                  interface_map: Dict[str, InterfacePort]) -> List[List[Tuple[float, float]]]:
+        """Compute the waypoints for every connection of one render pass.
+
+        Endpoints shared by several connections (fan-outs) are resolved once.
+        """
+        endpoint_cache: Dict[str, Tuple[Optional[Tuple[float, float]], bool]] = {}
+        route = self.route
+        return [route(conn, model, instance_map, interface_map, endpoint_cache)
+                for conn in connections]
+
     def route(self, conn: Connection, model: NetworkModel,
               instance_map: Dict[str, FBInstance],
-              interface_map: Dict[str, InterfacePort]) -> List[Tuple[float, float]]:
+              interface_map: Dict[str, InterfacePort],
+              endpoint_cache: Optional[Dict[str, Tuple[Optional[Tuple[float, float]], bool]]] = None
+              ) -> List[Tuple[float, float]]:
         """Compute the waypoints for a connection."""
-        src_pos = self._resolve_endpoint(conn.source, instance_map, interface_map, is_source=True)
-        dst_pos = self._resolve_endpoint(conn.destination, instance_map, interface_map, is_source=False)
+        if endpoint_cache is None:
+            endpoint_cache = {}
+        cached_endpoint = self._cached_endpoint
+        src_pos, src_is_iface = cached_endpoint(conn.source, endpoint_cache,
+                                                instance_map, interface_map)
+        dst_pos, dst_is_iface = cached_endpoint(conn.destination, endpoint_cache,
+                                                instance_map, interface_map)
 
         if src_pos is None or dst_pos is None:
             return []
@@ -1461,48 +1732,23 @@ class ConnectionRouter:
         x1, y1 = src_pos
         x2, y2 = dst_pos
 
-        # Check if source or destination is an interface port
-        src_parts = conn.source.split(".")
-        dst_parts = conn.destination.split(".")
-        src_is_iface = len(src_parts) == 1 and src_parts[0] in interface_map
-        dst_is_iface = len(dst_parts) == 1 and dst_parts[0] in interface_map
-
         # Interface-to-FB or FB-to-interface connections
         # For interface→FB: dx1 is the offset (in canvas units) from the
         # interface port's rendered position to the turn point.
         # For FB→interface: dx1 is a normal offset from the source FB port.
-        if src_is_iface and not dst_is_iface:
-            # Interface port (left sidebar) → FB input port
-            dx1 = conn.dx1 * self.SCALE
-            if abs(y1 - y2) < 1 and dx1 == 0:
-                points = [(x1, y1), (x2, y2)]
-            elif dx1 != 0:
-                turn_x = x1 + dx1
-                points = [(x1, y1), (turn_x, y1), (turn_x, y2), (x2, y2)]
-            else:
-                # No hint – place turn midway
-                turn_x = (x1 + x2) / 2
-                points = [(x1, y1), (turn_x, y1), (turn_x, y2), (x2, y2)]
-            return self._simplify_points(points)
-
-        if dst_is_iface and not src_is_iface:
-            # FB output port → interface port (right sidebar)
-            dx1 = conn.dx1 * self.SCALE
-            if abs(y1 - y2) < 1 and dx1 == 0:
-                points = [(x1, y1), (x2, y2)]
-            elif dx1 != 0:
-                turn_x = x1 + dx1
-                points = [(x1, y1), (turn_x, y1), (turn_x, y2), (x2, y2)]
-            else:
-                turn_x = (x1 + x2) / 2
-                points = [(x1, y1), (turn_x, y1), (turn_x, y2), (x2, y2)]
-            return self._simplify_points(points)
+        # Both turn once at dx1, or midway when there is no hint.
+        scale = self.SCALE
+        dx1 = conn.dx1 * scale
+        if src_is_iface != dst_is_iface:
+            if dx1 == 0 and abs(y1 - y2) < 1:
+                return self._straight_route(x1, y1, x2, y2)
+            turn_x = x1 + dx1 if dx1 != 0 else (x1 + x2) / 2
+            return self._turn_route(x1, y1, turn_x, x2, y2)
 
         # Scale the routing hints — use proportional placement
         # dx1/dx2/dy are in canvas units; we scale them the same as positions
-        dx1 = conn.dx1 * self.SCALE
-        dx2 = conn.dx2 * self.SCALE
-        dy = conn.dy * self.SCALE
+        dx2 = conn.dx2 * scale
+        dy = conn.dy * scale
 
         # Enforce minimum routing distances so lines remain visible
         MIN_ROUTE_DX = 30  # minimum horizontal detour in pixels
@@ -1517,15 +1763,15 @@ class ConnectionRouter:
                 # Ensure mid_x is at least MIN_ROUTE_DX from source
                 if abs(dx1) < MIN_ROUTE_DX:
                     mid_x = x1 + (MIN_ROUTE_DX if dx1 > 0 else -MIN_ROUTE_DX)
-                points = [(x1, y1), (mid_x, y1), (mid_x, y2), (x2, y2)]
+                return self._turn_route(x1, y1, mid_x, x2, y2)
             else:
                 # Direct: just go horizontal then vertical
                 mid_x = (x1 + x2) / 2
                 if abs(y1 - y2) < 1:
                     # Same height: straight line
-                    points = [(x1, y1), (x2, y2)]
+                    return self._straight_route(x1, y1, x2, y2)
                 else:
-                    points = [(x1, y1), (mid_x, y1), (mid_x, y2), (x2, y2)]
+                    return self._turn_route(x1, y1, mid_x, x2, y2)
         else:
             # U-turn / complex route with dy (5 or 6 segments)
             # dx1 = horizontal offset from SOURCE port to first vertical segment
@@ -1549,50 +1795,77 @@ class ConnectionRouter:
         # Clean up: remove duplicate adjacent points and collinear points
         return self._simplify_points(points)
 
+    def _cached_endpoint(self, endpoint: str,
+                         endpoint_cache: Dict[str, Tuple[Optional[Tuple[float, float]], bool]],
+                         instance_map: Dict[str, FBInstance],
+                         interface_map: Dict[str, InterfacePort]
+                         ) -> Tuple[Optional[Tuple[float, float]], bool]:
+        """Return (position, is_interface_port) for an endpoint, memoized per pass."""
+        entry = endpoint_cache.get(endpoint)
+        if entry is None:
+            is_iface = "." not in endpoint and endpoint in interface_map
+            pos = self._resolve_endpoint(endpoint, instance_map, interface_map)
+            entry = endpoint_cache[endpoint] = (pos, is_iface)
+        return entry
+
     def _resolve_endpoint(self, endpoint: str,
                           instance_map: Dict[str, FBInstance],
-                          interface_map: Dict[str, InterfacePort],
-                          is_source: bool) -> Optional[Tuple[float, float]]:
+                          interface_map: Dict[str, InterfacePort]) -> Optional[Tuple[float, float]]:
         """Resolve a connection endpoint to (x, y) coordinates."""
-        parts = endpoint.split(".")
-        if len(parts) == 2:
-            fb_name, port_name = parts
-            inst = instance_map.get(fb_name)
-            if inst and port_name in inst.port_positions:
-                return inst.port_positions[port_name]
-            return None
-        elif len(parts) == 1:
+        fb_name, sep, port_name = endpoint.partition(".")
+        if not sep:
             # Interface port
-            iport = interface_map.get(parts[0])
+            iport = interface_map.get(endpoint)
             if iport:
                 return (iport.render_x, iport.render_y)
             return None
+        if "." not in port_name:
+            inst = instance_map.get(fb_name)
+            if inst and port_name in inst.port_positions:
+                return inst.port_positions[port_name]
         return None
 
+    def _straight_route(self, x1: float, y1: float,
+                        x2: float, y2: float) -> List[Tuple[float, float]]:
+        """Two-point route; only coincident endpoints need simplifying."""
+        if abs(x2 - x1) > 0.1 or abs(y2 - y1) > 0.1:
+            return [(x1, y1), (x2, y2)]
+        return [(x1, y1)]
+
+    def _turn_route(self, x1: float, y1: float, turn_x: float,
+                    x2: float, y2: float) -> List[Tuple[float, float]]:
+        """Horizontal → vertical → horizontal route with a single turn at turn_x.
+
+        When the turn is clear of both endpoints and the ports are at different
+        heights none of the four points can be a duplicate or collinear, so
+        the general simplification pass is skipped.
+        """
+        if abs(turn_x - x1) > 0.1 and abs(turn_x - x2) > 0.1 and abs(y1 - y2) > 0.1:
+            return [(x1, y1), (turn_x, y1), (turn_x, y2), (x2, y2)]
+        return self._simplify_points([(x1, y1), (turn_x, y1), (turn_x, y2), (x2, y2)])
+
     def _simplify_points(self, points: List[Tuple[float, float]]) -> List[Tuple[float, float]]:
-        """Remove redundant points (duplicates and collinear)."""
+        """Remove redundant points (duplicates and collinear) in a single pass."""
         if len(points) < 2:
             return points
 
-        result = [points[0]]
-        for i in range(1, len(points)):
-            if abs(points[i][0] - result[-1][0]) > 0.1 or abs(points[i][1] - result[-1][1]) > 0.1:
-                result.append(points[i])
-
-        # Remove collinear points
-        if len(result) < 3:
-            return result
-
-        simplified = [result[0]]
-        for i in range(1, len(result) - 1):
-            x0, y0 = simplified[-1]
-            x1, y1 = result[i]
-            x2, y2 = result[i + 1]
-            # Check if collinear
-            if not (abs(x0 - x1) < 0.1 and abs(x1 - x2) < 0.1) and \
-               not (abs(y0 - y1) < 0.1 and abs(y1 - y2) < 0.1):
-                simplified.append(result[i])
-        simplified.append(result[-1])
+        last = points[0]              # last non-duplicate input point
+        simplified = [last]
+        for p in points[1:]:
+            px, py = p
+            lx, ly = last
+            if abs(px - lx) <= 0.1 and abs(py - ly) <= 0.1:
+                continue
+            last = p
+            # Drop the previous point if it lies on the line from its
+            # predecessor to p
+            if len(simplified) >= 2:
+                x0, y0 = simplified[-2]
+                if (abs(x0 - lx) < 0.1 and abs(lx - px) < 0.1) or \
+                   (abs(y0 - ly) < 0.1 and abs(ly - py) < 0.1):
+                    simplified[-1] = p
+                    continue
+            simplified.append(p)
 
         return simplified
 
@@ -1601,6 +1874,66 @@ class ConnectionRouter:
 # SVG Renderer
 # ===========================================================================
 
+# FB block outline with notches between the event, name and data sections.
+# Corner radius 3 (4diac CORNER_DIM = 6) and notch inset 9 (FB_NOTCH_INSET)
+# are baked in; the slots take the width/height/section-dependent values.
+_BLOCK_PATH_TEMPLATE = """M 3 0
+            L %s 0
+            A 3 3 0 0 1 %s 3
+            L %s %s
+            A 3 3 0 0 1 %s %s
+            L %s %s
+            L %s %s
+            L %s %s
+            A 3 3 0 0 1 %s %s
+            L %s %s
+            A 3 3 0 0 1 %s %s
+            L 3 %s
+            A 3 3 0 0 1 0 %s
+            L 0 %s
+            A 3 3 0 0 1 3 %s
+            L 9 %s
+            L 9 %s
+            L 3 %s
+            A 3 3 0 0 1 0 %s
+            L 0 3
+            A 3 3 0 0 1 3 0
+            Z"""
+
+
+@functools.lru_cache(maxsize=8)
+def _grid_tile_lines(grid_minor: float) -> Tuple[str, ...]:
+    """Build the <line> elements of one background grid tile (10x10 minor cells).
+
+    Minor lines are dotted, every 5th is dashed, every 10th thicker dashed.
+    The 10th horizontal line sits at the 2nd position, the 10th vertical at
+    the 8th. The tile only depends on the cell size, so it is cached.
+    """
+    grid_super = grid_minor * 10
+    h_off = 1  # horizontal (y) offset for the 10th-line
+    v_off = 7  # vertical (x) offset for the 10th-line
+    lines = []
+    for i in range(10):
+        pos = i * grid_minor
+        # Horizontal lines (y positions) — offset by h_off
+        grid_idx_h = (i - h_off) % 10
+        if grid_idx_h == 0:
+            lines.append(f'      <line x1="0" y1="{pos:.2f}" x2="{grid_super:.2f}" y2="{pos:.2f}" stroke="#C0C0C0" stroke-width="1.5" stroke-dasharray="6,3"/>')
+        elif grid_idx_h == 5:
+            lines.append(f'      <line x1="0" y1="{pos:.2f}" x2="{grid_super:.2f}" y2="{pos:.2f}" stroke="#C0C0C0" stroke-width="1" stroke-dasharray="4,3"/>')
+        else:
+            lines.append(f'      <line x1="0" y1="{pos:.2f}" x2="{grid_super:.2f}" y2="{pos:.2f}" stroke="#C0C0C0" stroke-width="0.5" stroke-dasharray="1,3"/>')
+        # Vertical lines (x positions) — offset by v_off
+        grid_idx_v = (i - v_off) % 10
+        if grid_idx_v == 0:
+            lines.append(f'      <line x1="{pos:.2f}" y1="0" x2="{pos:.2f}" y2="{grid_super:.2f}" stroke="#C0C0C0" stroke-width="1.5" stroke-dasharray="6,3"/>')
+        elif grid_idx_v == 5:
+            lines.append(f'      <line x1="{pos:.2f}" y1="0" x2="{pos:.2f}" y2="{grid_super:.2f}" stroke="#C0C0C0" stroke-width="1" stroke-dasharray="4,3"/>')
+        else:
+            lines.append(f'      <line x1="{pos:.2f}" y1="0" x2="{pos:.2f}" y2="{grid_super:.2f}" stroke="#C0C0C0" stroke-width="0.5" stroke-dasharray="1,3"/>')
+    return tuple(lines)
+
+
 class NetworkSVGRenderer:
     """Renders the network model as SVG."""
 
@@ -1608,6 +1941,8 @@ class NetworkSVGRenderer:
     FONT_FAMILY = "'TGL 0-17_std', 'TGL 0-17', 'Times New Roman', Times, serif"
     FONT_FAMILY_ITALIC = "'TGL 0-16_std', 'TGL 0-16', 'Times New Roman', Times, serif"
     FONT_SIZE = 12
+    # Attribute pair shared by every regular-weight label
+    FONT_ATTRS = f'font-family="{FONT_FAMILY}" font-size="{FONT_SIZE}"'
 
     FONT_FACE_STYLE = '''
   <style>
@@ -1637,6 +1972,21 @@ class NetworkSVGRenderer:
     }
   </style>'''
 
+    # Drop shadow filter referenced by block outlines (show_shadow)
+    SHADOW_DEFS = '''
+  <defs>
+    <filter id="dropShadow" x="-20%" y="-20%" width="140%" height="140%">
+      <feGaussianBlur in="SourceAlpha" stdDeviation="3" result="blur"/>
+      <feOffset in="blur" dx="1" dy="1" result="offsetBlur"/>
+      <feFlood flood-color="#000000" flood-opacity="0.5" result="shadowColor"/>
+      <feComposite in="shadowColor" in2="offsetBlur" operator="in" result="shadow"/>
+      <feMerge>
+        <feMergeNode in="shadow"/>
+        <feMergeNode in="SourceGraphic"/>
+      </feMerge>
+    </filter>
+  </defs>'''
+
     # Colors (from 4diac IDE)
     BLOCK_STROKE_COLOR = "#A0A0A0"
     EVENT_PORT_COLOR = "#63B31F"
@@ -1653,6 +2003,15 @@ class NetworkSVGRenderer:
     REAL_TYPES = {"REAL", "LREAL", "ANY_REAL"}
     BIT_TYPES = {"BYTE", "WORD", "DWORD", "LWORD", "ANY_BIT"}
 
+    # Data type → port colour; anything not listed uses DATA_PORT_COLOR
+    PORT_TYPE_COLORS = {
+        "BOOL": BOOL_PORT_COLOR,
+        **dict.fromkeys(STRING_TYPES, STRING_PORT_COLOR),
+        **dict.fromkeys(INT_TYPES, ANY_INT_PORT_COLOR),
+        **dict.fromkeys(REAL_TYPES, ANY_REAL_PORT_COLOR),
+        **dict.fromkeys(BIT_TYPES, ANY_BIT_PORT_COLOR),
+    }
+
     # Layout – must match NetworkLayoutEngine constants
     PORT_ROW_HEIGHT = 17
     BLOCK_PADDING = 10
@@ -1663,69 +2022,25 @@ class NetworkSVGRenderer:
     # Connection diagonal endpoint length
     CONN_DIAG_LEN = 4
 
-    def __init__(self, show_shadow: bool = True, show_grid: bool = False, settings: BlockSizeSettings = None):
+    def __init__(self, show_shadow: bool = True, show_grid: bool = False, settings: BlockSizeSettings = None,
+                 minify: bool = False):
         self.show_shadow = show_shadow
         self.show_grid = show_grid
+        self.minify = minify
         self.settings = settings or BlockSizeSettings()
         # Load font for text measurement (same as layout engine)
-        self._font = None
-        self._font_italic = None
+        self._font_key = None
+        self._font_italic_key = None
         self._init_fonts()
 
     def _init_fonts(self):
         """Initialize fonts for text measurement."""
-        if not PILLOW_AVAILABLE:
-            return
-
-        home = os.path.expanduser("~")
-        script_dir = os.path.dirname(os.path.abspath(__file__))
-        tgl_dir = os.path.join(script_dir, "tgl")
-        font_candidates = [
-            f"{home}/Library/Fonts/TGL 0-17.ttf",
-            f"{home}/Library/Fonts/TGL 0-17_std.ttf",
-            f"{home}/Library/Fonts/TGL 0-17 alt.ttf",
-            f"{home}/Library/Fonts/TGL 0-17 alt_std.ttf",
-            os.path.join(tgl_dir, "TGL 0-17.ttf"),
-            os.path.join(tgl_dir, "TGL 0-17_std.ttf"),
-            "/Library/Fonts/TGL 0-17.ttf",
-            "/Library/Fonts/TGL 0-17 alt.ttf",
-            "/Library/Fonts/Times New Roman.ttf",
-            "/System/Library/Fonts/Times.ttc",
-            "/usr/share/fonts/truetype/msttcorefonts/Times_New_Roman.ttf",
-            "C:\\Windows\\Fonts\\times.ttf",
-        ]
-        italic_candidates = [
-            f"{home}/Library/Fonts/TGL 0-16.ttf",
-            f"{home}/Library/Fonts/TGL 0-16_std.ttf",
-            os.path.join(tgl_dir, "TGL 0-16.ttf"),
-            os.path.join(tgl_dir, "TGL 0-16_std.ttf"),
-            "/Library/Fonts/TGL 0-16.ttf",
-            "/Library/Fonts/Times New Roman Italic.ttf",
-            "/System/Library/Fonts/Times.ttc",
-            "/usr/share/fonts/truetype/msttcorefonts/Times_New_Roman_Italic.ttf",
-            "C:\\Windows\\Fonts\\timesi.ttf",
-        ]
-        for fp in font_candidates:
-            try:
-                self._font = ImageFont.truetype(fp, self.FONT_SIZE)
-                break
-            except:
-                continue
-        for fp in italic_candidates:
-            try:
-                self._font_italic = ImageFont.truetype(fp, self.FONT_SIZE)
-                break
-            except:
-                continue
-        if self._font_italic is None and self._font is not None:
-            self._font_italic = self._font
+        self._font_key, self._font_italic_key = _find_font_keys(self.FONT_SIZE)
 
     def _measure_text(self, text: str, italic: bool = False) -> float:
         """Measure text width for layout calculations."""
-        if PILLOW_AVAILABLE and self._font:
-            font = self._font_italic if italic and self._font_italic else self._font
-            bbox = font.getbbox(text)
-            return bbox[2] - bbox[0] if bbox else len(text) * 8
+        if self._font_key:
+            return _measure_text_width(text, self._font_italic_key if italic else self._font_key)
         else:
             return len(text) * 8.5
 
@@ -1735,18 +2050,7 @@ class NetworkSVGRenderer:
             of_idx = t.rfind(" OF ")
             if of_idx >= 0:
                 t = t[of_idx + 4:]
-        if t == "BOOL":
-            return self.BOOL_PORT_COLOR
-        elif t in self.STRING_TYPES:
-            return self.STRING_PORT_COLOR
-        elif t in self.INT_TYPES:
-            return self.ANY_INT_PORT_COLOR
-        elif t in self.REAL_TYPES:
-            return self.ANY_REAL_PORT_COLOR
-        elif t in self.BIT_TYPES:
-            return self.ANY_BIT_PORT_COLOR
-        else:
-            return self.DATA_PORT_COLOR
+        return self.PORT_TYPE_COLORS.get(t, self.DATA_PORT_COLOR)
 
     ANY_TYPES = {"ANY", "ANY_ELEMENTARY", "ANY_MAGNITUDE", "ANY_NUM",
                  "ANY_REAL", "ANY_INT", "ANY_BIT", "ANY_STRING", "ANY_CHARS",
@@ -1807,39 +2111,48 @@ class NetworkSVGRenderer:
             return False
         return port_type not in self.PRIMITIVE_TYPES
 
-    def _is_double_line_connection(self, conn: Connection, model: NetworkModel,
-                                    instance_map: Dict[str, FBInstance]) -> bool:
+    @staticmethod
+    def _build_port_type_index(model: NetworkModel,
+                               instance_map: Dict[str, FBInstance]) -> Dict[Tuple[str, Optional[str]], str]:
+        """Index endpoint data types for connection colouring.
+
+        Interface ports key as (name, None); instance data ports as
+        (fb_name, port_name), outputs taking precedence over inputs.
+        """
+        index: Dict[Tuple[str, Optional[str]], str] = {}
+        for ip in model.interface_ports:
+            index.setdefault((ip.name, None), ip.port_type)
+        for fb_name, inst in instance_map.items():
+            for p in chain(inst.data_outputs, inst.data_inputs):
+                index.setdefault((fb_name, p.name), p.port_type)
+        return index
+
+    def _is_double_line_connection(self, conn: Connection,
+                                    port_types: Dict[Tuple[str, Optional[str]], str]) -> bool:
         """Check if a connection should be rendered as a double-line (adapter or struct)."""
         if conn.conn_type == "adapter":
             return True
         if conn.conn_type == "data":
-            src_type = self._resolve_port_type(conn.source, model, instance_map)
+            src_type = self._resolve_port_type(conn.source, port_types)
             if self._is_struct_type(src_type):
                 return True
-            dst_type = self._resolve_port_type(conn.destination, model, instance_map)
+            dst_type = self._resolve_port_type(conn.destination, port_types)
             if self._is_struct_type(dst_type):
                 return True
         return False
 
-    def _resolve_port_type(self, endpoint: str, model: NetworkModel,
-                           instance_map: Dict[str, FBInstance]) -> str:
+    def _resolve_port_type(self, endpoint: str,
+                           port_types: Dict[Tuple[str, Optional[str]], str]) -> str:
         """Resolve the data type of a connection endpoint (source or destination)."""
-        parts = endpoint.split(".")
-        if len(parts) == 2:
-            fb_name, port_name = parts
-            inst = instance_map.get(fb_name)
-            if inst:
-                for p in inst.data_outputs + inst.data_inputs:
-                    if p.name == port_name:
-                        return p.port_type
-        elif len(parts) == 1:
-            for ip in model.interface_ports:
-                if ip.name == parts[0]:
-                    return ip.port_type
-        return ""
-
-    def _get_connection_color(self, conn: Connection, model: NetworkModel,
-                               instance_map: Dict[str, FBInstance]) -> str:
+        fb_name, sep, port_name = endpoint.partition(".")
+        if not sep:
+            return port_types.get((endpoint, None), "")
+        if "." in port_name:
+            return ""
+        return port_types.get((fb_name, port_name), "")
+
+    def _get_connection_color(self, conn: Connection,
+                               port_types: Dict[Tuple[str, Optional[str]], str]) -> str:
         """Determine the color for a connection.
 
         For data connections, prefer the source port type.  If the source
@@ -1851,11 +2164,11 @@ class NetworkSVGRenderer:
         elif conn.conn_type == "adapter":
             return self.ADAPTER_PORT_COLOR
         else:
-            src_type = self._resolve_port_type(conn.source, model, instance_map)
+            src_type = self._resolve_port_type(conn.source, port_types)
             if src_type and src_type not in self.ANY_TYPES:
                 return self._get_port_color(src_type)
             # Source is generic/unknown — try destination type
-            dst_type = self._resolve_port_type(conn.destination, model, instance_map)
+            dst_type = self._resolve_port_type(conn.destination, port_types)
             if dst_type and dst_type not in self.ANY_TYPES:
                 return self._get_port_color(dst_type)
             # Both generic — use source color if available, else fallback
@@ -1868,8 +2181,8 @@ class NetworkSVGRenderer:
         parts = []
 
         # Build lookup maps
-        instance_map = {inst.name: inst for inst in model.instances}
-        interface_map = {ip.name: ip for ip in model.interface_ports}
+        instance_map = model.instance_map()
+        interface_map = model.interface_map()
 
         # Get diagram bounds
         min_x, min_y, max_x, max_y = layout.get_diagram_bounds(model)
@@ -1910,14 +2223,9 @@ class NetworkSVGRenderer:
             if model.comment:
                 text_x = hx + 5
                 text_y = hy + hh / 2 + self.FONT_SIZE * 0.35
-                # Escape XML entities in comment
-                comment_text = (model.comment
-                    .replace("&", "&amp;")
-                    .replace("<", "&lt;")
-                    .replace(">", "&gt;")
-                    .replace('"', "&quot;"))
+                comment_text = _xml_escape(model.comment)
                 parts.append(f'  <text x="{text_x:.1f}" y="{text_y:.1f}"'
-                            f' font-family="{self.FONT_FAMILY}" font-size="{self.FONT_SIZE}"'
+                            f' {self.FONT_ATTRS}'
                             f' font-weight="bold" fill="#333333">{comment_text}</text>')
 
         # Render sidebar backgrounds (behind everything else)
@@ -1958,56 +2266,26 @@ class NetworkSVGRenderer:
             else:
                 gx, gy, gw, gh = vb_x, vb_y, vb_w, vb_h
             # Pattern origin aligned to content area top-left
-            # Tile = 10 minor cells; minor=dotted, every 5th=dashed, every 10th=thicker dashed
-            # Grid offsets: 10th horizontal line at 7th position, 10th vertical line at 2nd
-            _h_off = 1  # horizontal (y) offset for the 10th-line
-            _v_off = 7  # vertical (x) offset for the 10th-line
             parts.append(f'  <defs>')
             parts.append(f'    <pattern id="grid" x="{gx:.1f}" y="{gy:.1f}" width="{_grid_super:.2f}" height="{_grid_super:.2f}" patternUnits="userSpaceOnUse">')
-            for i in range(10):
-                pos = i * _grid_minor
-                # Horizontal lines (y positions) — offset by _h_off
-                grid_idx_h = (i - _h_off) % 10
-                if grid_idx_h == 0:
-                    parts.append(f'      <line x1="0" y1="{pos:.2f}" x2="{_grid_super:.2f}" y2="{pos:.2f}" stroke="#C0C0C0" stroke-width="1.5" stroke-dasharray="6,3"/>')
-                elif grid_idx_h == 5:
-                    parts.append(f'      <line x1="0" y1="{pos:.2f}" x2="{_grid_super:.2f}" y2="{pos:.2f}" stroke="#C0C0C0" stroke-width="1" stroke-dasharray="4,3"/>')
-                else:
-                    parts.append(f'      <line x1="0" y1="{pos:.2f}" x2="{_grid_super:.2f}" y2="{pos:.2f}" stroke="#C0C0C0" stroke-width="0.5" stroke-dasharray="1,3"/>')
-                # Vertical lines (x positions) — offset by _v_off
-                grid_idx_v = (i - _v_off) % 10
-                if grid_idx_v == 0:
-                    parts.append(f'      <line x1="{pos:.2f}" y1="0" x2="{pos:.2f}" y2="{_grid_super:.2f}" stroke="#C0C0C0" stroke-width="1.5" stroke-dasharray="6,3"/>')
-                elif grid_idx_v == 5:
-                    parts.append(f'      <line x1="{pos:.2f}" y1="0" x2="{pos:.2f}" y2="{_grid_super:.2f}" stroke="#C0C0C0" stroke-width="1" stroke-dasharray="4,3"/>')
-                else:
-                    parts.append(f'      <line x1="{pos:.2f}" y1="0" x2="{pos:.2f}" y2="{_grid_super:.2f}" stroke="#C0C0C0" stroke-width="0.5" stroke-dasharray="1,3"/>')
+            parts.extend(_grid_tile_lines(_grid_minor))
             parts.append(f'    </pattern>')
             parts.append(f'  </defs>')
             parts.append(f'  <rect x="{gx:.1f}" y="{gy:.1f}" width="{gw:.1f}" height="{gh:.1f}" fill="url(#grid)"/>')
 
-        # Assign interface indices for staggered routing of interface connections
-        left_idx = 0
-        right_idx = 0
-        for conn in model.connections:
-            src_parts = conn.source.split(".")
-            dst_parts = conn.destination.split(".")
-            if len(src_parts) == 1 and src_parts[0] in interface_map:
-                conn._iface_index = left_idx
-                left_idx += 1
-            elif len(dst_parts) == 1 and dst_parts[0] in interface_map:
-                conn._iface_index = right_idx
-                right_idx += 1
-
         # Render connections first (behind blocks)
         router = ConnectionRouter()
         parts.append('  <g id="connections">')
-        for conn in model.connections:
-            waypoints = router.route(conn, model, instance_map, interface_map)
+        all_waypoints = router.route_all(model.connections, model, instance_map, interface_map)
+        port_types = self._build_port_type_index(model, instance_map)
+        get_color = self._get_connection_color
+        is_double = self._is_double_line_connection
+        render_connection = self._render_connection
+        append = parts.append
+        for conn, waypoints in zip(model.connections, all_waypoints):
             if waypoints:
-                color = self._get_connection_color(conn, model, instance_map)
-                double = self._is_double_line_connection(conn, model, instance_map)
-                parts.append(self._render_connection(waypoints, color, double_line=double))
+                append(render_connection(waypoints, get_color(conn, port_types),
+                                         double_line=is_double(conn, port_types)))
         parts.append('  </g>')
 
         # Render interface ports
@@ -2019,29 +2297,15 @@ class NetworkSVGRenderer:
         # Render FB instance blocks (on top of connections)
         parts.append('  <g id="instances">')
         for inst in model.instances:
-            parts.append(self._render_instance(inst))
+            self._render_instance(inst, parts)
         parts.append('  </g>')
 
         parts.append('</svg>')
-        return "\n".join(parts)
+        svg = "\n".join(parts)
+        return _minify_svg(svg) if self.minify else svg
 
     def _svg_header(self, vb_x: float, vb_y: float, vb_w: float, vb_h: float) -> str:
-        shadow_defs = ""
-        if self.show_shadow:
-            shadow_defs = '''
-  <defs>
-    <filter id="dropShadow" x="-20%" y="-20%" width="140%" height="140%">
-      <feGaussianBlur in="SourceAlpha" stdDeviation="3" result="blur"/>
-      <feOffset in="blur" dx="1" dy="1" result="offsetBlur"/>
-      <feFlood flood-color="#000000" flood-opacity="0.5" result="shadowColor"/>
-      <feComposite in="shadowColor" in2="offsetBlur" operator="in" result="shadow"/>
-      <feMerge>
-        <feMergeNode in="shadow"/>
-        <feMergeNode in="SourceGraphic"/>
-      </feMerge>
-    </filter>
-  </defs>'''
-
+        shadow_defs = self.SHADOW_DEFS if self.show_shadow else ""
         return f'''<?xml version="1.0" encoding="UTF-8"?>
 <svg xmlns="http://www.w3.org/2000/svg"
      viewBox="{vb_x:.1f} {vb_y:.1f} {vb_w:.1f} {vb_h:.1f}"
@@ -2049,68 +2313,43 @@ class NetworkSVGRenderer:
 
     # ----- Instance Block Rendering -----
 
-    def _render_instance(self, inst: FBInstance) -> str:
-        """Render a complete FB instance block."""
-        parts = []
+    def _render_instance(self, inst: FBInstance, parts: List[str]):
+        """Append a complete FB instance block to the document's parts list."""
         x = inst.render_x
         y = inst.render_y
 
-        parts.append(f'    <g id="fb_{inst.name}" transform="translate({x:.1f}, {y:.1f})">')
-
-        # Block outline
-        parts.append(self._render_block_outline(inst))
-
-        # Name section
-        parts.append(self._render_name_section(inst))
-
-        # Event ports
-        parts.append(self._render_event_ports(inst))
-
-        # Data ports
-        parts.append(self._render_data_ports(inst))
-
-        # Parameter value labels (literals on input ports)
-        parts.append(self._render_parameter_labels(inst))
-
-        # Adapter ports
-        parts.append(self._render_adapter_ports(inst))
-
-        # Instance name above the block
-        parts.append(self._render_instance_label(inst))
-
-        parts.append('    </g>')
-        return "\n".join(parts)
+        parts.extend((
+            f'    <g id="fb_{inst.name}" transform="translate({_fmt_1f(x)}, {_fmt_1f(y)})">',
+            # Block outline
+            self._render_block_outline(inst),
+            # Name section
+            self._render_name_section(inst),
+            # Event ports
+            self._render_event_ports(inst),
+            # Data ports
+            self._render_data_ports(inst),
+            # Parameter value labels (literals on input ports)
+            self._render_parameter_labels(inst),
+            # Adapter ports
+            self._render_adapter_ports(inst),
+            # Instance name above the block
+            self._render_instance_label(inst),
+            '    </g>',
+        ))
 
     def _render_block_outline(self, inst: FBInstance) -> str:
-        notch = 9   # 4diac FB_NOTCH_INSET = 9
-        r = 3       # 4diac CORNER_DIM = 6 (diameter), radius = 3
-        et = inst.event_section_height
-        nb = inst.name_section_bottom
         w = inst.block_width
         h = inst.block_height
+        et = inst.event_section_height
+        nb = inst.name_section_bottom
+        w_r = w - 3
+        et_r = et - 3
+        nb_r = nb + 3
+        h_r = h - 3
 
-        path_d = f"""M {r} 0
-            L {w - r} 0
-            A {r} {r} 0 0 1 {w} {r}
-            L {w} {et - r}
-            A {r} {r} 0 0 1 {w - r} {et}
-            L {w - notch} {et}
-            L {w - notch} {nb}
-            L {w - r} {nb}
-            A {r} {r} 0 0 1 {w} {nb + r}
-            L {w} {h - r}
-            A {r} {r} 0 0 1 {w - r} {h}
-            L {r} {h}
-            A {r} {r} 0 0 1 0 {h - r}
-            L 0 {nb + r}
-            A {r} {r} 0 0 1 {r} {nb}
-            L {notch} {nb}
-            L {notch} {et}
-            L {r} {et}
-            A {r} {r} 0 0 1 0 {et - r}
-            L 0 {r}
-            A {r} {r} 0 0 1 {r} 0
-            Z"""
+        path_d = _BLOCK_PATH_TEMPLATE % (
+            w_r, w, w, et_r, w_r, et, w - 9, et, w - 9, nb, w_r, nb, w, nb_r,
+            w, h_r, w_r, h, h, h_r, nb_r, nb, nb, et, et, et_r)
 
         filter_attr = ' filter="url(#dropShadow)"' if self.show_shadow else ''
 
@@ -2258,7 +2497,7 @@ class NetworkSVGRenderer:
 
         return f'''      <!-- Instance Name -->
       <text x="{label_x}" y="{label_y}"
-            font-family="{self.FONT_FAMILY}" font-size="{self.FONT_SIZE}"
+            {self.FONT_ATTRS}
             fill="#000000" text-anchor="middle">{inst.name}</text>'''
 
     def _render_event_ports(self, inst: FBInstance) -> str:
@@ -2338,8 +2577,8 @@ class NetworkSVGRenderer:
             text_x = -3
             text_y = py + self.FONT_SIZE * 0.35
             parts.append(
-                f'      <text x="{text_x}" y="{text_y:.1f}"'
-                f' font-family="{self.FONT_FAMILY}" font-size="{self.FONT_SIZE}"'
+                f'      <text x="{text_x}" y="{_fmt_1f(text_y)}"'
+                f' {self.FONT_ATTRS}'
                 f' fill="#000000" text-anchor="end">{display_value}</text>')
 
         return "\n".join(parts)
@@ -2378,7 +2617,7 @@ class NetworkSVGRenderer:
 
         display_name = _truncate_label(port.name, self.settings.max_pin_label_size)
         return f'''      <polygon points="{tri_points}" fill="{color}"/>
-      <text x="{text_x}" y="{text_y}" font-family="{self.FONT_FAMILY}" font-size="{self.FONT_SIZE}"
+      <text x="{text_x}" y="{text_y}" {self.FONT_ATTRS}
             fill="#000000">{display_name}</text>'''
 
     def _render_port_right(self, port: Port, y: float, block_width: float, color: str, is_event: bool = False) -> str:
@@ -2394,7 +2633,7 @@ class NetworkSVGRenderer:
 
         display_name = _truncate_label(port.name, self.settings.max_pin_label_size)
         return f'''      <polygon points="{tri_points}" fill="{color}"/>
-      <text x="{text_x}" y="{text_y}" font-family="{self.FONT_FAMILY}" font-size="{self.FONT_SIZE}"
+      <text x="{text_x}" y="{text_y}" {self.FONT_ATTRS}
             fill="#000000" text-anchor="end">{display_name}</text>'''
 
     def _render_socket_port(self, port: Port, y: float) -> str:
@@ -2428,7 +2667,7 @@ class NetworkSVGRenderer:
 
         display_name = _truncate_label(port.name, self.settings.max_pin_label_size)
         return f'''      <path d="{path_d}" fill="none" stroke="{self.ADAPTER_PORT_COLOR}" stroke-width="1"/>
-      <text x="{text_x}" y="{text_y}" font-family="{self.FONT_FAMILY}" font-size="{self.FONT_SIZE}"
+      <text x="{text_x}" y="{text_y}" {self.FONT_ATTRS}
             fill="#000000">{display_name}</text>'''
 
     def _render_plug_port(self, port: Port, y: float, block_width: float) -> str:
@@ -2462,7 +2701,7 @@ class NetworkSVGRenderer:
 
         display_name = _truncate_label(port.name, self.settings.max_pin_label_size)
         return f'''      <path d="{path_d}" fill="{self.ADAPTER_PORT_COLOR}"/>
-      <text x="{text_x}" y="{text_y}" font-family="{self.FONT_FAMILY}" font-size="{self.FONT_SIZE}"
+      <text x="{text_x}" y="{text_y}" {self.FONT_ATTRS}
             fill="#000000" text-anchor="end">{display_name}</text>'''
 
     # ----- Connection Rendering -----
@@ -2479,15 +2718,17 @@ class NetworkSVGRenderer:
 
         result = [waypoints[0]]
 
-        for i in range(1, len(waypoints) - 1):
-            px, py = waypoints[i - 1]
-            cx, cy = waypoints[i]
-            nx, ny = waypoints[i + 1]
+        # Each segment is the outgoing leg of one corner and the incoming leg
+        # of the next, so its direction and length are computed only once
+        px, py = waypoints[0]
+        cx, cy = waypoints[1]
+        out_dx = cx - px
+        out_dy = cy - py
+        out_len = (out_dx * out_dx + out_dy * out_dy) ** 0.5
 
+        for nx, ny in waypoints[2:]:
             # Incoming direction
-            in_dx = cx - px
-            in_dy = cy - py
-            in_len = (in_dx * in_dx + in_dy * in_dy) ** 0.5
+            in_dx, in_dy, in_len = out_dx, out_dy, out_len
 
             # Outgoing direction
             out_dx = nx - cx
@@ -2515,6 +2756,7 @@ class NetworkSVGRenderer:
                 result.append((bx2, by2))
             else:
                 result.append((cx, cy))
+            cx, cy = nx, ny
 
         result.append(waypoints[-1])
         return result
@@ -2533,7 +2775,7 @@ class NetworkSVGRenderer:
         beveled = self._bevel_waypoints(waypoints)
 
         # Build polyline points
-        pts = " ".join(f"{x:.1f},{y:.1f}" for x, y in beveled)
+        pts = " ".join(f"{_fmt_1f(x)},{_fmt_1f(y)}" for x, y in beveled)
 
         if double_line:
             lighter = self._lighter_color(color)
@@ -2554,23 +2796,21 @@ class NetworkSVGRenderer:
         """
         x = ip.render_x
         y = ip.render_y
+        display_name = _truncate_label(ip.name, self.settings.max_interface_bar_size)
+        text_y = y + self.FONT_SIZE * 0.35  # vertically center text with symbol
+
+        # Adapter ports use socket/plug symbols (with their own colors)
+        if ip.category == "adapter":
+            return self._render_interface_adapter_port(ip, x, y, text_y, display_name)
 
         # Determine color
         if ip.category == "event":
             color = self.EVENT_PORT_COLOR
-        elif ip.category == "adapter":
-            color = self.ADAPTER_PORT_COLOR
         else:
             color = self._get_port_color(ip.port_type)
 
         tw = self.TRIANGLE_WIDTH
         th = self.TRIANGLE_HEIGHT
-        display_name = _truncate_label(ip.name, self.settings.max_interface_bar_size)
-        text_y = y + self.FONT_SIZE * 0.35  # vertically center text with symbol
-
-        # Adapter ports use socket/plug symbols
-        if ip.category == "adapter":
-            return self._render_interface_adapter_port(ip, x, y, text_y, display_name)
 
         if ip.direction == "input":
             # x = right edge of input sidebar
@@ -2590,7 +2830,7 @@ class NetworkSVGRenderer:
             text_anchor = "start"
 
         return f'''    <polygon points="{tri_points}" fill="{color}"/>
-    <text x="{text_x}" y="{text_y:.1f}" font-family="{self.FONT_FAMILY}" font-size="{self.FONT_SIZE}"
+    <text x="{text_x}" y="{_fmt_1f(text_y)}" {self.FONT_ATTRS}
           fill="#000000" text-anchor="{text_anchor}">{display_name}</text>'''
 
     def _render_interface_adapter_port(self, ip: InterfacePort,
@@ -2659,7 +2899,7 @@ class NetworkSVGRenderer:
             stroke = f' stroke="{color}" stroke-width="1"'
 
         return f'''    <path d="{path_d}" fill="{fill}"{stroke}/>
-    <text x="{text_x}" y="{text_y:.1f}" font-family="{self.FONT_FAMILY}" font-size="{self.FONT_SIZE}"
+    <text x="{text_x}" y="{_fmt_1f(text_y)}" {self.FONT_ATTRS}
           fill="#000000" text-anchor="{text_anchor}">{display_name}</text>'''
 
 
@@ -2667,19 +2907,44 @@ class NetworkSVGRenderer:
 # High-Level API
 # ===========================================================================
 
+def _network_type_lib_paths(xml_source, type_lib) -> List[str]:
+    """Type library search paths for one input: type_lib plus the input's directory."""
+    if isinstance(type_lib, list):
+        type_lib_paths = list(type_lib)
+    elif type_lib:
+        type_lib_paths = [type_lib]
+    else:
+        type_lib_paths = []
+    # Also try the directory containing the input file
+    if isinstance(xml_source, str) and not _is_xml_text(xml_source):
+        input_dir = str(Path(xml_source).parent)
+        if input_dir not in type_lib_paths:
+            type_lib_paths.append(input_dir)
+    return type_lib_paths
+
+
 def convert_network_to_svg(xml_source, output_path: str = None,
                            type_lib = None,
                            show_shadow: bool = True,
                            show_grid: bool = False,
-                           settings: BlockSizeSettings = None) -> str:
+                           settings: BlockSizeSettings = None,
+                           type_cache: bool = False,
+                           minify: bool = False,
+                           resolver: Optional[TypeResolver] = None) -> str:
     """Convert an IEC 61499 network XML to SVG.
 
     Args:
-        xml_source: File path or XML string
+        xml_source: File path, XML string, XML bytes or parsed root element
         output_path: Optional output file path
         type_lib: Type library root directory or list of directories
         show_shadow: Enable drop shadow
         settings: Block size settings (default: load from block_size_settings.ini)
+        type_cache: Reuse parsed type interfaces across runs via a cache file
+            under the user's cache directory (see default_type_cache_path)
+        minify: Emit compact SVG without indentation and line breaks
+        resolver: TypeResolver to reuse, with the type library paths this
+            input would get; type_lib and type_cache are then ignored and
+            saving its disk cache is left to the caller
 
     Returns:
         SVG string
@@ -2692,27 +2957,21 @@ def convert_network_to_svg(xml_source, output_path: str = None,
     model = parser.parse(xml_source)
 
     # Resolve types
-    if isinstance(type_lib, list):
-        type_lib_paths = list(type_lib)
-    elif type_lib:
-        type_lib_paths = [type_lib]
+    if resolver is None:
+        resolver = TypeResolver(_network_type_lib_paths(xml_source, type_lib),
+                                use_disk_cache=type_cache)
+        resolver.resolve(model)
+        resolver.save_disk_cache()
     else:
-        type_lib_paths = []
-    # Also try the directory containing the input file
-    if isinstance(xml_source, str) and not ('<' in xml_source):
-        input_dir = str(Path(xml_source).parent)
-        if input_dir not in type_lib_paths:
-            type_lib_paths.append(input_dir)
-
-    resolver = TypeResolver(type_lib_paths)
-    resolver.resolve(model)
+        resolver.resolve(model)
 
     # Layout
     layout = NetworkLayoutEngine(settings=settings)
     layout.layout(model)
 
     # Render
-    renderer = NetworkSVGRenderer(show_shadow=show_shadow, show_grid=show_grid, settings=settings)
+    renderer = NetworkSVGRenderer(show_shadow=show_shadow, show_grid=show_grid, settings=settings,
+                                  minify=minify)
     svg = renderer.render(model, layout)
 
     # Write output
@@ -2724,47 +2983,171 @@ def convert_network_to_svg(xml_source, output_path: str = None,
     return svg
 
 
+# Network element per root tag, and per root tag the bodies that rule out a
+# network.  Only BasicFB/SimpleFB qualify: a Service section can precede the
+# SubAppNetwork of a SubAppType and coexist with an FBType's network.
+_NETWORK_TAGS = {
+    "SubAppType": ("SubAppNetwork",),
+    "FBType": ("FBNetwork", "CompositeFB"),
+}
+_NON_NETWORK_BODIES = {
+    "FBType": ("BasicFB", "SimpleFB"),
+}
+
+
+def _parse_network_file(path: str):
+    """Parse a type file if it contains a network.
+
+    Streams the file and gives up at the body of a basic or simple FB type,
+    which cannot be combined with a network, so those files are never fully
+    parsed.  Once a top-level network element is seen the rest is parsed
+    into the same tree, which the caller hands to the converter instead of
+    reading the file a second time.
+
+    Returns:
+        The root element, or None if the file has no network
+    """
+    depth = 0
+    root = None
+    network_tags = None
+    non_network_bodies = ()
+    events = ET.iterparse(path, events=("start", "end"))
+    for event, elem in events:
+        if event == "end":
+            depth -= 1
+            continue
+        depth += 1
+        if depth == 1:
+            root = elem
+            network_tags = _NETWORK_TAGS.get(elem.tag)
+            if network_tags is None:
+                return None
+            non_network_bodies = _NON_NETWORK_BODIES.get(elem.tag, ())
+        elif depth == 2:
+            if elem.tag in network_tags:
+                for _ in events:
+                    pass
+                return root
+            if elem.tag in non_network_bodies:
+                return None
+    return None
+
+
+# TypeResolvers of the running batch in this process, keyed by
+# (type library paths, use_disk_cache), so inputs that share a library
+# parse each type file once
+_batch_resolvers: Dict[Tuple[Tuple[str, ...], bool], TypeResolver] = {}
+
+
+def _reset_batch_resolvers():
+    """Drop the resolvers of a previous batch (also the pool initializer)."""
+    _batch_resolvers.clear()
+
+
+def _convert_batch_file(src: str, dst: str, options: dict,
+                        prefetch_threads: Optional[int] = None) -> Tuple[bool, Optional[str], dict]:
+    """Convert one batch input if it contains a network.
+
+    Runs in a worker process, so failures are returned as a message for the
+    parent to report instead of being printed here.  Type cache entries are
+    handed back too, and the parent writes the cache file once per batch.
+    prefetch_threads is passed on to new TypeResolvers.
+
+    Returns:
+        (converted, error message or None, type cache updates)
+    """
+    try:
+        # Check if the file actually contains a network
+        root = _parse_network_file(src)
+        if root is None:
+            return False, None, {}
+
+        type_lib_paths = _network_type_lib_paths(src, options['type_lib'])
+        key = (tuple(type_lib_paths), options['type_cache'])
+        resolver = _batch_resolvers.get(key)
+        if resolver is None:
+            resolver = _batch_resolvers[key] = TypeResolver(
+                type_lib_paths, use_disk_cache=options['type_cache'],
+                prefetch_threads=prefetch_threads)
+
+        # convert_network_to_svg creates the output directory
+        convert_network_to_svg(root, dst, resolver=resolver, **options)
+        return True, None, resolver.take_disk_cache_updates()
+    except Exception as e:
+        return False, f"Error converting {src}: {e}", {}
+
+
 def convert_batch(input_dir: str, output_dir: str,
                   type_lib = None,
                   show_shadow: bool = True,
                   show_grid: bool = False,
                   recursive: bool = True,
-                  settings: BlockSizeSettings = None) -> int:
-    """Batch convert all network files in a directory."""
-    input_path = Path(input_dir)
-    output_path = Path(output_dir)
-    output_path.mkdir(parents=True, exist_ok=True)
+                  settings: BlockSizeSettings = None,
+                  type_cache: bool = False,
+                  minify: bool = False,
+                  jobs: Optional[int] = None) -> int:
+    """Batch convert all network files in a directory.
+
+    Files are converted in up to ``jobs`` worker processes (default: one per
+    available CPU); ``jobs=1`` converts them one after another in this process.
+    With ``type_cache`` the persistent type cache is written once at the end.
+    """
+    if jobs is not None and jobs < 1:
+        raise ValueError(f"jobs must be at least 1, got {jobs}")
+    Path(output_dir).mkdir(parents=True, exist_ok=True)
+
+    # Single traversal with plain string paths; entries are bucketed per
+    # extension so all .fbt files still come before the .sub files
+    found = {".fbt": [], ".sub": []}
+    for dirpath, dirnames, filenames in os.walk(input_dir):
+        rel_dir = os.path.relpath(dirpath, input_dir)
+        out_dir = output_dir if rel_dir == os.curdir else os.path.join(output_dir, rel_dir)
+        for filename in filenames:
+            stem, ext = os.path.splitext(filename)
+            bucket = found.get(ext)
+            if bucket is not None:
+                bucket.append((os.path.join(dirpath, filename),
+                               os.path.join(out_dir, stem + ".network.svg")))
+        if not recursive:
+            break
+    sources = [src for bucket in found.values() for src, _ in bucket]
+    targets = [dst for bucket in found.values() for _, dst in bucket]
+
+    options = dict(type_lib=type_lib,
+                   show_shadow=show_shadow,
+                   show_grid=show_grid,
+                   settings=settings,
+                   type_cache=type_cache,
+                   minify=minify)
+    workers = min(jobs or _available_cpus(), len(sources))
+    if workers > 1:
+        # Largest files first, so a big network does not start last and
+        # hold up the end of the batch while the other workers sit idle
+        order = sorted(range(len(sources)), key=lambda i: os.path.getsize(sources[i]),
+                       reverse=True)
+        with ProcessPoolExecutor(max_workers=workers,
+                                 initializer=_reset_batch_resolvers) as pool:
+            # The worker processes already use the CPUs: no prefetch threads
+            futures = {i: pool.submit(_convert_batch_file, sources[i], targets[i], options, 1)
+                       for i in order}
+            results = [futures[i].result() for i in range(len(sources))]
+    else:
+        _reset_batch_resolvers()
+        try:
+            results = [_convert_batch_file(src, dst, options) for src, dst in zip(sources, targets)]
+        finally:
+            _reset_batch_resolvers()
 
+    # Report in input order, whichever worker finished first
     count = 0
-    for ext in ['*.fbt', '*.sub']:
-        pattern = f"**/{ext}" if recursive else ext
-        for f in input_path.glob(pattern):
-            try:
-                # Check if the file actually contains a network
-                tree = ET.parse(str(f))
-                root = tree.getroot()
-                has_network = False
-                if root.tag == "SubAppType" and root.find("SubAppNetwork") is not None:
-                    has_network = True
-                elif root.tag == "FBType" and (root.find("FBNetwork") is not None or root.find("CompositeFB") is not None):
-                    has_network = True
-
-                if not has_network:
-                    continue
-
-                relative = f.relative_to(input_path)
-                svg_file = output_path / relative.with_suffix('.network.svg')
-                svg_file.parent.mkdir(parents=True, exist_ok=True)
-
-                convert_network_to_svg(str(f), str(svg_file),
-                                      type_lib=type_lib,
-                                      show_shadow=show_shadow,
-                                      show_grid=show_grid,
-                                      settings=settings)
-                count += 1
-            except Exception as e:
-                print(f"Error converting {f}: {e}", file=sys.stderr)
-
+    cache_updates = {}
+    for converted, error, updates in results:
+        if error:
+            print(error, file=sys.stderr)
+        count += converted
+        cache_updates.update(updates)
+    if type_cache:
+        TypeResolver.merge_disk_cache(default_type_cache_path(), cache_updates)
     return count
 
 
@@ -2785,8 +3168,13 @@ def main():
     parser.add_argument("--no-shadow", action="store_true", help="Disable drop shadow")
     parser.add_argument("--grid", action="store_true", help="Show background grid")
     parser.add_argument("--settings", help="Path to block_size_settings.ini file")
+    parser.add_argument("--no-type-cache", action="store_true", help="Don't read or write the persistent type cache")
+    parser.add_argument("--minify", action="store_true", help="Write compact SVG without indentation and line breaks")
+    parser.add_argument("-j", "--jobs", type=int, help="Worker processes for batch mode (default: one per available CPU)")
 
     args = parser.parse_args()
+    if args.jobs is not None and args.jobs < 1:
+        parser.error("-j/--jobs must be at least 1")
     input_path = Path(args.input)
 
     if not input_path.exists():
@@ -2810,14 +3198,19 @@ def main():
                             show_shadow=show_shadow,
                             show_grid=show_grid,
                             recursive=not args.no_recursive,
-                            settings=settings)
+                            settings=settings,
+                            type_cache=not args.no_type_cache,
+                            minify=args.minify,
+                            jobs=args.jobs)
         print(f"Converted {count} network files to {output_dir}")
     elif args.stdout:
         svg = convert_network_to_svg(str(input_path),
                                      type_lib=type_lib_paths,
                                      show_shadow=show_shadow,
                                      show_grid=show_grid,
-                                     settings=settings)
+                                     settings=settings,
+                                     type_cache=not args.no_type_cache,
+                                     minify=args.minify)
         print(svg)
     else:
         output_path = args.output or str(input_path.with_suffix('.network.svg'))
@@ -2825,7 +3218,9 @@ def main():
                               type_lib=type_lib_paths,
                               show_shadow=show_shadow,
                               show_grid=show_grid,
-                              settings=settings)
+                              settings=settings,
+                              type_cache=not args.no_type_cache,
+                              minify=args.minify)
         print(f"Written to {output_path}")
 
 
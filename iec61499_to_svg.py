@@ -8,9 +8,11 @@ in the style of 4diac IDE.
 
 import xml.etree.ElementTree as ET
 import argparse
+import functools
 import sys
 from pathlib import Path
 from dataclasses import dataclass, field
+from itertools import chain
 from typing import Optional, Dict
 
 # Try to import Pillow for accurate text measurement
@@ -21,7 +23,86 @@ except ImportError:
     PILLOW_AVAILABLE = False
 
 
-@dataclass
+@functools.lru_cache(maxsize=4)
+def _load_fonts(size: int):
+    """Load (regular, italic) measurement fonts once per size.
+
+    Batch conversion creates one renderer per file; caching here keeps the
+    font files from being opened and parsed again for each of them.
+    """
+    if not PILLOW_AVAILABLE:
+        return None, None
+
+    font = None
+    font_italic = None
+
+    # Try to load TGL fonts first (the actual fonts used in SVG), then fallback to system fonts
+    # TGL 0-17 is regular, TGL 0-16 is italic (for technical drawings)
+    import os
+    home = os.path.expanduser("~")
+
+    script_dir = os.path.dirname(os.path.abspath(__file__))
+    tgl_dir = os.path.join(script_dir, "tgl")
+    font_candidates = [
+        # TGL fonts - actual fonts used in the SVG
+        f"{home}/Library/Fonts/TGL 0-17.ttf",
+        f"{home}/Library/Fonts/TGL 0-17_std.ttf",
+        f"{home}/Library/Fonts/TGL 0-17 alt.ttf",
+        f"{home}/Library/Fonts/TGL 0-17 alt_std.ttf",
+        os.path.join(tgl_dir, "TGL 0-17.ttf"),
+        os.path.join(tgl_dir, "TGL 0-17_std.ttf"),
+        "/Library/Fonts/TGL 0-17.ttf",
+        "/Library/Fonts/TGL 0-17 alt.ttf",
+        # Fallback system fonts (Times New Roman)
+        "/Library/Fonts/Times New Roman.ttf",
+        "/System/Library/Fonts/Times.ttc",
+        "/usr/share/fonts/truetype/msttcorefonts/Times_New_Roman.ttf",
+        "/usr/share/fonts/TTF/times.ttf",
+        "C:\\Windows\\Fonts\\times.ttf",
+    ]
+
+    italic_candidates = [
+        # TGL italic font
+        f"{home}/Library/Fonts/TGL 0-16.ttf",
+        f"{home}/Library/Fonts/TGL 0-16_std.ttf",
+        os.path.join(tgl_dir, "TGL 0-16.ttf"),
+        os.path.join(tgl_dir, "TGL 0-16_std.ttf"),
+        "/Library/Fonts/TGL 0-16.ttf",
+        # Fallback system fonts (Times New Roman Italic)
+        "/Library/Fonts/Times New Roman Italic.ttf",
+        "/System/Library/Fonts/Times.ttc",
+        "/usr/share/fonts/truetype/msttcorefonts/Times_New_Roman_Italic.ttf",
+        "C:\\Windows\\Fonts\\timesi.ttf",
+    ]
+
+    # Skip missing files up front: a stat is far cheaper than a failed
+    # truetype() call and its exception
+    for font_path in font_candidates:
+        if not os.path.isfile(font_path):
+            continue
+        try:
+            font = ImageFont.truetype(font_path, size)
+            break
+        except:
+            continue
+
+    # Try to load italic font
+    for font_path in italic_candidates:
+        if not os.path.isfile(font_path):
+            continue
+        try:
+            font_italic = ImageFont.truetype(font_path, size)
+            break
+        except:
+            continue
+
+    # If no italic font found, use regular font
+    if font_italic is None and font is not None:
+        font_italic = font
+    return font, font_italic
+
+
+@dataclass(slots=True)
 class Port:
     """Represents an event or data port."""
     name: str
@@ -30,7 +111,7 @@ class Port:
     associated_vars: list = field(default_factory=list)
 
 
-@dataclass
+@dataclass(slots=True)
 class FunctionBlock:
     """Represents an IEC 61499 Function Block."""
     name: str
@@ -300,66 +381,7 @@ class SVGRenderer:
 
     def _init_fonts(self):
         """Initialize fonts for text measurement if Pillow is available."""
-        if not PILLOW_AVAILABLE:
-            return
-
-        # Try to load TGL fonts first (the actual fonts used in SVG), then fallback to system fonts
-        # TGL 0-17 is regular, TGL 0-16 is italic (for technical drawings)
-        import os
-        home = os.path.expanduser("~")
-
-        script_dir = os.path.dirname(os.path.abspath(__file__))
-        tgl_dir = os.path.join(script_dir, "tgl")
-        font_candidates = [
-            # TGL fonts - actual fonts used in the SVG
-            f"{home}/Library/Fonts/TGL 0-17.ttf",
-            f"{home}/Library/Fonts/TGL 0-17_std.ttf",
-            f"{home}/Library/Fonts/TGL 0-17 alt.ttf",
-            f"{home}/Library/Fonts/TGL 0-17 alt_std.ttf",
-            os.path.join(tgl_dir, "TGL 0-17.ttf"),
-            os.path.join(tgl_dir, "TGL 0-17_std.ttf"),
-            "/Library/Fonts/TGL 0-17.ttf",
-            "/Library/Fonts/TGL 0-17 alt.ttf",
-            # Fallback system fonts (Times New Roman)
-            "/Library/Fonts/Times New Roman.ttf",
-            "/System/Library/Fonts/Times.ttc",
-            "/usr/share/fonts/truetype/msttcorefonts/Times_New_Roman.ttf",
-            "/usr/share/fonts/TTF/times.ttf",
-            "C:\\Windows\\Fonts\\times.ttf",
-        ]
-
-        italic_candidates = [
-            # TGL italic font
-            f"{home}/Library/Fonts/TGL 0-16.ttf",
-            f"{home}/Library/Fonts/TGL 0-16_std.ttf",
-            os.path.join(tgl_dir, "TGL 0-16.ttf"),
-            os.path.join(tgl_dir, "TGL 0-16_std.ttf"),
-            "/Library/Fonts/TGL 0-16.ttf",
-            # Fallback system fonts (Times New Roman Italic)
-            "/Library/Fonts/Times New Roman Italic.ttf",
-            "/System/Library/Fonts/Times.ttc",
-            "/usr/share/fonts/truetype/msttcorefonts/Times_New_Roman_Italic.ttf",
-            "C:\\Windows\\Fonts\\timesi.ttf",
-        ]
-
-        for font_path in font_candidates:
-            try:
-                self._font = ImageFont.truetype(font_path, self.FONT_SIZE)
-                break
-            except:
-                continue
-
-        # Try to load italic font
-        for font_path in italic_candidates:
-            try:
-                self._font_italic = ImageFont.truetype(font_path, self.FONT_SIZE)
-                break
-            except:
-                continue
-
-        # If no italic font found, use regular font
-        if self._font_italic is None and self._font is not None:
-            self._font_italic = self._font
+        self._font, self._font_italic = _load_fonts(self.FONT_SIZE)
 
     def _get_port_color(self, port_type: str) -> str:
         """Return the fill color for a data port based on its type."""
@@ -460,7 +482,7 @@ class SVGRenderer:
         adapter_space = self.TRIANGLE_WIDTH * 2 + 3 + 1.5
 
         max_left_port_width = 0
-        for port in fb.event_inputs + fb.data_inputs:
+        for port in chain(fb.event_inputs, fb.data_inputs):
             port_width = triangle_space + self._measure_text(port.name)
             max_left_port_width = max(max_left_port_width, port_width)
         # Include sockets (input adapters)
@@ -471,7 +493,7 @@ class SVGRenderer:
         # Calculate max width needed for right side ports (outputs)
         # text + gap (3px) + triangle (5px)
         max_right_port_width = 0
-        for port in fb.event_outputs + fb.data_outputs:
+        for port in chain(fb.event_outputs, fb.data_outputs):
             port_width = triangle_space + self._measure_text(port.name)
             max_right_port_width = max(max_right_port_width, port_width)
         # Include plugs (output adapters)